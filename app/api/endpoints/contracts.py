@@ -1,9 +1,10 @@
 
 import shutil
+import uuid
 from typing import Optional, List
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
 
 from ...models.schemas import (
     ProcessingRequest,
@@ -13,21 +14,43 @@ from ...models.schemas import (
     ContractResult
 )
 from ...services.contract_service import get_contract_service, ContractProcessingService
+from ...services.file_storage import save_upload_file
 from ...config import get_settings
+from ..responses import conditional_file_response, json_response
 
 router = APIRouter(prefix="/contracts", tags=["Contracts"])
 
+_settings = get_settings()
+_TEMP_DIR = _settings.temp_dir
+
 
 def get_service() -> ContractProcessingService:
     return get_contract_service()
 
 
-async def save_upload_file(upload_file: UploadFile, destination: Path) -> Path:
-    content = await upload_file.read()
-    destination.parent.mkdir(parents=True, exist_ok=True)
-    with open(destination, "wb") as f:
-        f.write(content)
-    return destination
+def build_processing_response(job: dict) -> ProcessingResponse:
+    # O job vem pronto do serviço; model_construct evita revalidar o job e cada item
+    return ProcessingResponse.model_construct(
+        job_id=job["job_id"],
+        status=job["status"],
+        total_contratos=job["total_contratos"],
+        processados=job["processados"],
+        sucessos=job["sucessos"],
+        falhas=job["falhas"],
+        resultados=[ContractResult.model_construct(**r) for r in job["resultados"]],
+        download_url=job.get("download_url"),
+        # Horários do próprio job (ISO), em vez de um datetime.now() por resposta
+        created_at=job["created_at"],
+        completed_at=job.get("completed_at"),
+        mensagem=job.get("mensagem", "")
+    )
+
+
+def remove_temp_file(path: Path) -> None:
+    try:
+        path.unlink(missing_ok=True)
+    except PermissionError:
+        pass
 
 
 @router.post(
@@ -37,33 +60,28 @@ async def save_upload_file(upload_file: UploadFile, destination: Path) -> Path:
     description="Lista todos os contratos disponíveis em um arquivo Excel"
 )
 async def list_contracts(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="Arquivo Excel (.xlsx)"),
     service: ContractProcessingService = Depends(get_service)
 ):
 
-    settings = get_settings()
-    
     if not file.filename.lower().endswith(('.xlsx', '.xls')):
         raise HTTPException(
             status_code=400,
             detail="Apenas arquivos Excel (.xlsx, .xls) são permitidos"
         )
     
-    import uuid
-    import gc
-    temp_path = settings.temp_dir / f"{uuid.uuid4()}_{file.filename}"
+    temp_path = _TEMP_DIR / f"{uuid.uuid4().hex}{Path(file.filename).suffix.lower()}"
     await save_upload_file(file, temp_path)
+    background_tasks.add_task(remove_temp_file, temp_path)
     
     try:
         result = await service.list_contracts(temp_path)
-        return ContractListResponse(**result)
-    finally:
-        gc.collect()
-        try:
-            if temp_path.exists():
-                temp_path.unlink()
-        except PermissionError:
-            pass
+        return json_response(ContractListResponse(**result))
+    except BaseException:
+        # Em caso de erro as background tasks não rodam; remove agora
+        remove_temp_file(temp_path)
+        raise
 
 
 @router.post(
@@ -73,33 +91,28 @@ async def list_contracts(
     description="Verifica pendências nos contratos sem gerar documentos"
 )
 async def verify_pendencias(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="Arquivo Excel (.xlsx)"),
     service: ContractProcessingService = Depends(get_service)
 ):
 
-    settings = get_settings()
-    
     if not file.filename.lower().endswith(('.xlsx', '.xls')):
         raise HTTPException(
             status_code=400,
             detail="Apenas arquivos Excel (.xlsx, .xls) são permitidos"
         )
     
-    import uuid
-    import gc
-    temp_path = settings.temp_dir / f"{uuid.uuid4()}_{file.filename}"
+    temp_path = _TEMP_DIR / f"{uuid.uuid4().hex}{Path(file.filename).suffix.lower()}"
     await save_upload_file(file, temp_path)
+    background_tasks.add_task(remove_temp_file, temp_path)
     
     try:
         result = await service.verify_pendencias(temp_path)
-        return PendenciasResponse(**result)
-    finally:
-        gc.collect()
-        try:
-            if temp_path.exists():
-                temp_path.unlink()
-        except PermissionError:
-            pass
+        return json_response(PendenciasResponse(**result))
+    except BaseException:
+        # Em caso de erro as background tasks não rodam; remove agora
+        remove_temp_file(temp_path)
+        raise
 
 
 @router.post(
@@ -109,24 +122,22 @@ async def verify_pendencias(
     description="Processa contratos e gera documentos Word preenchidos"
 )
 async def process_contracts(
+    background_tasks: BackgroundTasks,
     template_id: str = Form(..., description="ID do template a usar"),
     file: UploadFile = File(..., description="Arquivo Excel com os contratos"),
     contratos: Optional[str] = Form(None, description="Lista de contratos separados por vírgula (vazio = todos)"),
     service: ContractProcessingService = Depends(get_service)
 ):
 
-    settings = get_settings()
-    
     if not file.filename.lower().endswith(('.xlsx', '.xls')):
         raise HTTPException(
             status_code=400,
             detail="Apenas arquivos Excel (.xlsx, .xls) são permitidos"
         )
     
-    import uuid
-    import gc
-    temp_path = settings.temp_dir / f"{uuid.uuid4()}_{file.filename}"
+    temp_path = _TEMP_DIR / f"{uuid.uuid4().hex}{Path(file.filename).suffix.lower()}"
     await save_upload_file(file, temp_path)
+    background_tasks.add_task(remove_temp_file, temp_path)
     
     try:
         contract_list = None
@@ -145,25 +156,11 @@ async def process_contracts(
                 detail=result.get("mensagem", "Erro ao processar contratos")
             )
         
-        return ProcessingResponse(
-            job_id=result["job_id"],
-            status=result["status"],
-            total_contratos=result["total_contratos"],
-            processados=result["processados"],
-            sucessos=result["sucessos"],
-            falhas=result["falhas"],
-            resultados=[ContractResult(**r) for r in result["resultados"]],
-            download_url=result.get("download_url"),
-            mensagem=result.get("mensagem", "")
-        )
-    
-    finally:
-        gc.collect()
-        try:
-            if temp_path.exists():
-                temp_path.unlink()
-        except PermissionError:
-            pass
+        return json_response(build_processing_response(result))
+    except BaseException:
+        # Em caso de erro as background tasks não rodam; remove agora
+        remove_temp_file(temp_path)
+        raise
 
 
 @router.get(
@@ -181,17 +178,30 @@ async def get_job_status(
     if not job:
         raise HTTPException(status_code=404, detail="Job não encontrado")
     
-    return ProcessingResponse(
-        job_id=job["job_id"],
-        status=job["status"],
-        total_contratos=job["total_contratos"],
-        processados=job["processados"],
-        sucessos=job["sucessos"],
-        falhas=job["falhas"],
-        resultados=[ContractResult(**r) for r in job["resultados"]],
-        download_url=job.get("download_url"),
-        mensagem=job.get("mensagem", "")
-    )
+    return json_response(build_processing_response(job))
+
+
+@router.get(
+    "/job/{job_id}/stream",
+    summary="Status do processamento (NDJSON)",
+    description="Obtém o status de um job em NDJSON: a primeira linha traz o resumo do job e cada linha seguinte um resultado"
+)
+async def stream_job_status(
+    job_id: str,
+    service: ContractProcessingService = Depends(get_service)
+):
+    job = await service.get_job(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    
+    def generate():
+        resumo = build_processing_response({**job, "resultados": []})
+        yield resumo.model_dump_json(exclude={"resultados"}, warnings=False) + "\n"
+        for r in job["resultados"]:
+            yield ContractResult.model_construct(**r).model_dump_json(warnings=False) + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 
 @router.get(
@@ -200,6 +210,7 @@ async def get_job_status(
     description="Faz download do ZIP com os documentos gerados"
 )
 async def download_documents(
+    request: Request,
     job_id: str,
     service: ContractProcessingService = Depends(get_service)
 ):
@@ -209,8 +220,9 @@ async def download_documents(
     if not zip_path:
         raise HTTPException(status_code=404, detail="Arquivo não encontrado")
     
-    return FileResponse(
-        path=str(zip_path),
+    return conditional_file_response(
+        request,
+        zip_path,
         filename=f"contratos_{job_id}.zip",
         media_type="application/zip"
     )
@@ -2,22 +2,51 @@
 Endpoints de Gerenciamento de Prints (Imagens das Cláusulas)
 """
 import os
+import asyncio
 import zipfile
 import tempfile
 import shutil
-from typing import List, Optional
+import threading
+import time
+from functools import partial
+from operator import attrgetter
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, List, Optional, Union
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Request
 from pydantic import BaseModel
-
-from ...config import get_settings
+from starlette.concurrency import run_in_threadpool
+
+from ...config import Settings, get_settings
+from ..responses import conditional_file_response
+from ...services.file_storage import (
+    UploadTooLargeError,
+    check_upload_size,
+    copy_fileobj,
+    partial_path,
+    save_upload_file
+)
 
 router = APIRouter(prefix="/prints", tags=["Prints"])
 
 # Extensões permitidas para imagens
-ALLOWED_IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg'}
-ALLOWED_ARCHIVE_EXTENSIONS = {'.zip', '.rar'}
+ALLOWED_IMAGE_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg'})
+ALLOWED_ARCHIVE_EXTENSIONS = frozenset({'.zip', '.rar'})
+_IMAGE_SUFFIXES = tuple(ALLOWED_IMAGE_EXTENSIONS)
+_ARCHIVE_SUFFIXES = tuple(ALLOWED_ARCHIVE_EXTENSIONS)
+
+# Mensagens de rejeição, montadas uma única vez
+INVALID_EXTENSION_REASON = f"Extensão não permitida. Apenas {', '.join(sorted(ALLOWED_IMAGE_EXTENSIONS))} são aceitos."
+UNSUPPORTED_TYPE_REASON = f"Tipo de arquivo não suportado. Aceitos: {', '.join(sorted(ALLOWED_IMAGE_EXTENSIONS | ALLOWED_ARCHIVE_EXTENSIONS))}"
+
+# Ordem de preferência das extensões quando um contrato tem mais de um print
+PRINT_EXTENSION_PRIORITY = ['.png', '.jpg', '.jpeg', '.PNG', '.JPG', '.JPEG']
+_PRINT_PRIORITY_RANK = {ext: rank for rank, ext in enumerate(PRINT_EXTENSION_PRIORITY)}
+
+# Validade da listagem em cache. Toda gravação (temporário .part + os.replace) já muda
+# o mtime do diretório; a validade cobre o que ele não pega em sistemas de arquivos
+# com mtime de resolução grosseira: mudanças no mesmo segundo da última leitura
+PRINTS_LIST_TTL = 30.0
 
 
 class PrintInfo(BaseModel):
@@ -51,156 +80,390 @@ class ValidationError(BaseModel):
 
 
 def get_prints_dir() -> Path:
-    """Retorna o diretório de prints"""
-    settings = get_settings()
-    settings.prints_dir.mkdir(parents=True, exist_ok=True)
-    return settings.prints_dir
+    """Retorna o diretório de prints (criado por get_settings().setup_directories())"""
+    return get_settings().prints_dir
+
+
+def get_extension(filename: str) -> str:
+    """Retorna a extensão do arquivo em minúsculas, sem construir um Path"""
+    i = filename.rfind('.')
+    return filename[i:].lower() if i >= 0 else ''
 
 
 def is_valid_image(filename: str) -> bool:
     """Verifica se o arquivo é uma imagem válida"""
-    ext = Path(filename).suffix.lower()
-    return ext in ALLOWED_IMAGE_EXTENSIONS
+    return filename.lower().endswith(_IMAGE_SUFFIXES)
 
 
 def is_archive(filename: str) -> bool:
     """Verifica se o arquivo é um arquivo compactado"""
-    ext = Path(filename).suffix.lower()
-    return ext in ALLOWED_ARCHIVE_EXTENSIONS
+    return filename.lower().endswith(_ARCHIVE_SUFFIXES)
+
+
+def iter_print_entries(prints_dir: Path):
+    """Percorre o diretório de prints uma única vez, retornando as imagens encontradas"""
+    with os.scandir(prints_dir) as it:
+        for entry in it:
+            if entry.is_file() and is_valid_image(entry.name):
+                yield entry
 
 
 def extract_contract_number(filename: str) -> str:
     """Extrai o número do contrato do nome do arquivo"""
-    return Path(filename).stem
+    return filename.rpartition('.')[0] or filename
+
+
+def _print_priority(filename: str) -> int:
+    """Posição da extensão do arquivo na ordem de preferência"""
+    i = filename.rfind('.')
+    ext = filename[i:] if i >= 0 else ''
+    return _PRINT_PRIORITY_RANK.get(ext, len(PRINT_EXTENSION_PRIORITY))
+
+
+class PrintsIndex:
+    """
+    Índice em memória {numero_do_contrato: [arquivos]} do diretório de prints.
+    
+    O índice é reconstruído quando o mtime do diretório muda (inclusive por
+    outros processos) ou quando é invalidado após uploads e remoções, de modo
+    que cada consulta custa um único stat do diretório. A listagem com os
+    tamanhos segue a mesma regra e, além disso, expira após PRINTS_LIST_TTL.
+    """
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._prints_dir: Optional[Path] = None
+        self._mtime_ns: Optional[int] = None
+        self._index: Dict[str, List[str]] = {}
+        self._listing: Optional["PrintListResponse"] = None
+        self._listing_key: Optional[tuple] = None
+        self._listing_at = 0.0
+    
+    def invalidate(self):
+        """Força a reconstrução do índice na próxima consulta"""
+        with self._lock:
+            self._mtime_ns = None
+            self._listing = None
+    
+    def _current(self, prints_dir: Path) -> Dict[str, List[str]]:
+        mtime_ns = os.stat(prints_dir).st_mtime_ns
+        with self._lock:
+            if self._prints_dir != prints_dir or self._mtime_ns != mtime_ns:
+                index: Dict[str, List[str]] = {}
+                for entry in iter_print_entries(prints_dir):
+                    index.setdefault(extract_contract_number(entry.name), []).append(entry.name)
+                for filenames in index.values():
+                    filenames.sort(key=_print_priority)
+                self._index = index
+                self._prints_dir = prints_dir
+                self._mtime_ns = mtime_ns
+            return self._index
+    
+    def lookup(self, prints_dir: Path, contract_number: str) -> List[str]:
+        """Retorna os arquivos do contrato, em ordem de preferência"""
+        return list(self._current(prints_dir).get(contract_number, ()))
+    
+    def listing(self, prints_dir: Path) -> "PrintListResponse":
+        """Retorna a listagem dos prints, ordenada pelo número do contrato"""
+        key = (prints_dir, os.stat(prints_dir).st_mtime_ns)
+        now = time.monotonic()
+        with self._lock:
+            if self._listing is None or self._listing_key != key or now - self._listing_at > PRINTS_LIST_TTL:
+                prints = sorted(
+                    (
+                        PrintInfo(
+                            filename=entry.name,
+                            contract_number=extract_contract_number(entry.name),
+                            size_bytes=entry.stat().st_size
+                        )
+                        for entry in iter_print_entries(prints_dir)
+                    ),
+                    key=attrgetter('contract_number')
+                )
+                self._listing = PrintListResponse(total=len(prints), prints=prints)
+                self._listing_key = key
+                self._listing_at = now
+            return self._listing
+
+
+_prints_index = PrintsIndex()
+
+
+def _archive_entry_basename(info) -> Optional[str]:
+    """Retorna o nome base de uma entrada do arquivo compactado, ou None se deve ser ignorada"""
+    # Ignora diretórios
+    if info.is_dir():
+        return None
+    name = info.filename
+    # Ignora arquivos do sistema Mac
+    if name.startswith('__MACOSX') or name.startswith('.'):
+        return None
+    return os.path.basename(name) or None
+
+
+class ArchiveError(Exception):
+    """Erro no próprio arquivo compactado (corrompido, ilegível ou acima dos limites)"""
+
+
+def _copy_entries(archive, entries: List[tuple], dest_dir: Path, staged: List[tuple]) -> None:
+    """
+    Copia as entradas de um arquivo compactado aberto para temporários no
+    diretório de destino, registrando (temporário, destino) em `staged`
+    """
+    for info, basename in entries:
+        # Extrai para o diretório de destino com o nome base
+        target_path = dest_dir / basename
+        part_path = partial_path(target_path)
+        staged.append((part_path, target_path))
+        with archive.open(info) as source, open(part_path, "wb") as target:
+            copy_fileobj(source, target)
+
+
+def _commit_staged(staged: List[tuple]) -> None:
+    """
+    Move os temporários de `staged` para os nomes finais. Cada print que seria
+    substituído é antes renomeado à parte; se uma troca falhar, as já feitas são
+    desfeitas e os prints anteriores voltam para o lugar.
+    """
+    done: List[tuple] = []  # (destino, cópia do print anterior ou None)
+    try:
+        for part_path, target_path in staged:
+            backup = partial_path(target_path)
+            try:
+                os.replace(target_path, backup)
+            except FileNotFoundError:
+                backup = None
+            done.append((target_path, backup))
+            os.replace(part_path, target_path)
+    except BaseException:
+        for target_path, backup in reversed(done):
+            try:
+                if backup is not None:
+                    os.replace(backup, target_path)
+                else:
+                    target_path.unlink(missing_ok=True)
+            except OSError:
+                # Desfaz o que for possível; o erro que interrompeu a troca é o que sobe
+                pass
+        raise
+    
+    for _, backup in done:
+        if backup is not None:
+            backup.unlink(missing_ok=True)
 
 
-def validate_archive_contents(archive_path: Path) -> tuple[List[str], List[dict]]:
+def _validate_and_extract(archive, dest_dir: Path, fail_fast: bool = True) -> tuple[List[str], List[dict]]:
     """
-    Valida o conteúdo de um arquivo ZIP.
+    Valida todas as entradas de um arquivo compactado aberto e, se todas
+    forem imagens válidas, extrai-as em paralelo. A extração é tudo ou
+    nada: as entradas são gravadas em temporários (.part) e só substituem
+    os prints do diretório depois que todas foram extraídas; se uma falhar,
+    os temporários são removidos e os prints anteriores ficam como estavam.
+    Se a troca de nomes falhar no meio, as trocas já feitas são desfeitas
+    (ver _commit_staged).
+    
+    Os workers compartilham o mesmo handle: o ZipFile serializa cada
+    seek+read do arquivo subjacente com um lock interno e a descompressão
+    (o zlib libera o GIL) acontece fora dele; o RarFile abre cada entrada
+    de forma independente.
+    
+    Com fail_fast, a validação para na primeira entrada inválida, já que
+    o arquivo inteiro será rejeitado de qualquer forma.
     
     Returns:
-        Tupla com (arquivos_validos, arquivos_invalidos)
+        Tupla com (arquivos_extraidos, arquivos_invalidos)
     """
-    valid_files = []
+    # Entradas com o mesmo nome base: a última prevalece, como na extração sequencial
+    valid_entries = {}
     invalid_files = []
     
-    ext = archive_path.suffix.lower()
-    
-    if ext == '.zip':
-        try:
-            with zipfile.ZipFile(archive_path, 'r') as zf:
-                for name in zf.namelist():
-                    # Ignora diretórios
-                    if name.endswith('/'):
-                        continue
-                    # Ignora arquivos do sistema Mac
-                    if name.startswith('__MACOSX') or name.startswith('.'):
-                        continue
-                    
-                    basename = os.path.basename(name)
-                    if not basename:
-                        continue
-                        
-                    if is_valid_image(basename):
-                        valid_files.append(name)
-                    else:
-                        invalid_files.append({
-                            "filename": basename,
-                            "reason": f"Extensão não permitida. Apenas {', '.join(ALLOWED_IMAGE_EXTENSIONS)} são aceitos."
-                        })
-        except zipfile.BadZipFile:
+    for info in archive.infolist():
+        basename = _archive_entry_basename(info)
+        if not basename:
+            continue
+        
+        if is_valid_image(basename):
+            valid_entries.pop(basename, None)
+            valid_entries[basename] = info
+        else:
             invalid_files.append({
-                "filename": archive_path.name,
-                "reason": "Arquivo ZIP corrompido ou inválido"
+                "filename": basename,
+                "reason": INVALID_EXTENSION_REASON
             })
+            if fail_fast:
+                break
     
-    elif ext == '.rar':
-        try:
-            import rarfile
-            with rarfile.RarFile(archive_path, 'r') as rf:
-                for name in rf.namelist():
-                    if name.endswith('/'):
-                        continue
-                    if name.startswith('__MACOSX') or name.startswith('.'):
-                        continue
-                    
-                    basename = os.path.basename(name)
-                    if not basename:
-                        continue
-                        
-                    if is_valid_image(basename):
-                        valid_files.append(name)
-                    else:
-                        invalid_files.append({
-                            "filename": basename,
-                            "reason": f"Extensão não permitida. Apenas {', '.join(ALLOWED_IMAGE_EXTENSIONS)} são aceitos."
-                        })
-        except ImportError:
-            invalid_files.append({
-                "filename": archive_path.name,
-                "reason": "Suporte a RAR não instalado. Use arquivos ZIP."
-            })
-        except Exception as e:
-            invalid_files.append({
-                "filename": archive_path.name,
-                "reason": f"Erro ao abrir arquivo RAR: {str(e)}"
-            })
+    # Se houver arquivos inválidos, nada é extraído
+    if invalid_files:
+        return [], invalid_files
     
-    return valid_files, invalid_files
+    # Proteção contra zip bombs, usando apenas os tamanhos do diretório central
+    settings = get_settings()
+    entries = [(info, basename) for basename, info in valid_entries.items()]
+    total_size = sum(info.file_size for info, _ in entries)
+    if total_size > settings.max_extract_size or any(
+        info.file_size / max(info.compress_size, 1) > settings.max_compression_ratio
+        for info, _ in entries
+    ):
+        raise ArchiveError("Arquivo compactado excede limite de expansão")
+    
+    # Se alguma entrada falhar, remove os temporários; nenhum print existente é tocado
+    staged: List[tuple] = []
+    workers = min(settings.max_workers, len(entries))
+    try:
+        if workers <= 1:
+            _copy_entries(archive, entries, dest_dir, staged)
+        else:
+            batches = [entries[i::workers] for i in range(workers)]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(partial(_copy_entries, archive, dest_dir=dest_dir, staged=staged), batches))
+        # Só com todas as entradas gravadas os temporários assumem os nomes finais
+        _commit_staged(staged)
+    except BaseException:
+        for partial_file, _ in staged:
+            partial_file.unlink(missing_ok=True)
+        raise
+    
+    return [basename for _, basename in entries], []
 
 
-def extract_archive(archive_path: Path, dest_dir: Path) -> List[str]:
+def process_archive(
+    source: Union[Path, BinaryIO],
+    ext: str,
+    dest_dir: Path,
+    *,
+    fail_fast: bool = True
+) -> tuple[List[str], List[dict]]:
     """
-    Extrai arquivos de um ZIP/RAR para o diretório de destino.
+    Valida e extrai um arquivo ZIP/RAR, abrindo-o uma única vez.
+    
+    Args:
+        source: Caminho do arquivo ou, para ZIP, o próprio arquivo já aberto
+        ext: Extensão do arquivo compactado (.zip ou .rar)
+        dest_dir: Diretório de destino das imagens
+        fail_fast: Para na primeira entrada inválida em vez de listar todas
     
     Returns:
-        Lista de arquivos extraídos
-    """
-    extracted = []
-    ext = archive_path.suffix.lower()
+        Tupla com (arquivos_extraidos, arquivos_invalidos)
     
+    Raises:
+        ArchiveError: Se o arquivo compactado em si não puder ser processado
+    """
     if ext == '.zip':
-        with zipfile.ZipFile(archive_path, 'r') as zf:
-            for name in zf.namelist():
-                if name.endswith('/'):
-                    continue
-                if name.startswith('__MACOSX') or name.startswith('.'):
-                    continue
-                
-                basename = os.path.basename(name)
-                if not basename or not is_valid_image(basename):
-                    continue
-                
-                # Extrai para o diretório de destino com o nome base
-                target_path = dest_dir / basename
-                with zf.open(name) as source:
-                    with open(target_path, 'wb') as target:
-                        target.write(source.read())
-                extracted.append(basename)
+        try:
+            with zipfile.ZipFile(source, 'r') as zf:
+                return _validate_and_extract(zf, dest_dir, fail_fast)
+        except zipfile.BadZipFile:
+            raise ArchiveError("Arquivo ZIP corrompido ou inválido")
     
     elif ext == '.rar':
         try:
             import rarfile
-            with rarfile.RarFile(archive_path, 'r') as rf:
-                for name in rf.namelist():
-                    if name.endswith('/'):
-                        continue
-                    if name.startswith('__MACOSX') or name.startswith('.'):
-                        continue
-                    
-                    basename = os.path.basename(name)
-                    if not basename or not is_valid_image(basename):
-                        continue
-                    
-                    target_path = dest_dir / basename
-                    with rf.open(name) as source:
-                        with open(target_path, 'wb') as target:
-                            target.write(source.read())
-                    extracted.append(basename)
         except ImportError:
-            pass
+            raise ArchiveError("Suporte a RAR não instalado. Use arquivos ZIP.")
+        
+        try:
+            with rarfile.RarFile(source, 'r') as rf:
+                return _validate_and_extract(rf, dest_dir, fail_fast)
+        except ArchiveError:
+            raise
+        except Exception as e:
+            raise ArchiveError(f"Erro ao abrir arquivo RAR: {str(e)}")
+    
+    return [], []
+
+
+async def _process_upload(
+    file: UploadFile,
+    prints_dir: Path,
+    settings: Settings,
+    semaphore: asyncio.Semaphore
+) -> tuple[List[str], List[dict]]:
+    """Processa um arquivo do upload, retornando (aceitos, rejeitados)"""
+    aceitos = []
+    rejeitados = []
+    
+    async with semaphore:
+        filename = file.filename
+        ext = get_extension(filename)
+        
+        # Limite próprio dos prints (max_print_upload_size); por padrão não há
+        try:
+            check_upload_size(file, settings.max_print_upload_size)
+        except UploadTooLargeError as e:
+            rejeitados.append({
+                "filename": filename,
+                "reason": str(e)
+            })
+            return aceitos, rejeitados
+        
+        # Arquivo de imagem individual
+        if ext in ALLOWED_IMAGE_EXTENSIONS:
+            try:
+                await save_upload_file(file, prints_dir / filename, settings.max_print_upload_size)
+                aceitos.append(filename)
+            except UploadTooLargeError as e:
+                rejeitados.append({
+                    "filename": filename,
+                    "reason": str(e)
+                })
+            except Exception as e:
+                rejeitados.append({
+                    "filename": filename,
+                    "reason": f"Erro ao salvar: {str(e)}"
+                })
+        
+        # Arquivo compactado (ZIP/RAR)
+        elif ext in ALLOWED_ARCHIVE_EXTENSIONS:
+            tmp_path = None
+            try:
+                if ext == '.zip':
+                    # O ZipFile lê direto do arquivo temporário mantido pelo UploadFile
+                    source = file.file
+                    source.seek(0)
+                else:
+                    # O rarfile precisa de um caminho real (usa o unrar externo)
+                    with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
+                        source = tmp_path = Path(tmp.name)
+                    await save_upload_file(file, tmp_path, settings.max_print_upload_size)
+                
+                # Valida e extrai o conteúdo em uma única passada, fora do event loop
+                extracted, invalid_files = await run_in_threadpool(process_archive, source, ext, prints_dir)
+            except (ArchiveError, UploadTooLargeError) as e:
+                rejeitados.append({
+                    "filename": filename,
+                    "reason": str(e)
+                })
+                return aceitos, rejeitados
+            finally:
+                # Remove o arquivo temporário
+                if tmp_path is not None:
+                    try:
+                        tmp_path.unlink()
+                    except:
+                        pass
+            
+            # Se houver arquivos inválidos, rejeita o ZIP inteiro
+            if invalid_files:
+                rejeitados.append({
+                    "filename": filename,
+                    "reason": f"Arquivo contém {len(invalid_files)} arquivo(s) inválido(s): {', '.join([f['filename'] for f in invalid_files[:5]])}{'...' if len(invalid_files) > 5 else ''}"
+                })
+            elif not extracted:
+                rejeitados.append({
+                    "filename": filename,
+                    "reason": "Arquivo compactado está vazio ou não contém imagens válidas"
+                })
+            else:
+                aceitos.extend(extracted)
+        
+        else:
+            rejeitados.append({
+                "filename": filename,
+                "reason": UNSUPPORTED_TYPE_REASON
+            })
     
-    return extracted
+    return aceitos, rejeitados
 
 
 @router.post(
@@ -227,66 +490,18 @@ async def upload_prints(
     **Validação de arquivos compactados:**
     - Se um ZIP/RAR contiver arquivos que não sejam imagens válidas, o upload será rejeitado.
     """
+    settings = get_settings()
     aceitos = []
     rejeitados = []
     
-    for file in files:
-        filename = file.filename
-        ext = Path(filename).suffix.lower()
-        
-        # Arquivo de imagem individual
-        if ext in ALLOWED_IMAGE_EXTENSIONS:
-            try:
-                content = await file.read()
-                target_path = prints_dir / filename
-                with open(target_path, 'wb') as f:
-                    f.write(content)
-                aceitos.append(filename)
-            except Exception as e:
-                rejeitados.append({
-                    "filename": filename,
-                    "reason": f"Erro ao salvar: {str(e)}"
-                })
-        
-        # Arquivo compactado (ZIP/RAR)
-        elif ext in ALLOWED_ARCHIVE_EXTENSIONS:
-            # Salva temporariamente
-            with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
-                content = await file.read()
-                tmp.write(content)
-                tmp_path = Path(tmp.name)
-            
-            try:
-                # Valida o conteúdo do arquivo
-                valid_files, invalid_files = validate_archive_contents(tmp_path)
-                
-                # Se houver arquivos inválidos, rejeita o ZIP inteiro
-                if invalid_files:
-                    rejeitados.append({
-                        "filename": filename,
-                        "reason": f"Arquivo contém {len(invalid_files)} arquivo(s) inválido(s): {', '.join([f['filename'] for f in invalid_files[:5]])}{'...' if len(invalid_files) > 5 else ''}"
-                    })
-                elif not valid_files:
-                    rejeitados.append({
-                        "filename": filename,
-                        "reason": "Arquivo compactado está vazio ou não contém imagens válidas"
-                    })
-                else:
-                    # Extrai os arquivos válidos
-                    extracted = extract_archive(tmp_path, prints_dir)
-                    aceitos.extend(extracted)
-            finally:
-                # Remove o arquivo temporário
-                try:
-                    tmp_path.unlink()
-                except:
-                    pass
-        
-        else:
-            rejeitados.append({
-                "filename": filename,
-                "reason": f"Tipo de arquivo não suportado. Aceitos: {', '.join(ALLOWED_IMAGE_EXTENSIONS | ALLOWED_ARCHIVE_EXTENSIONS)}"
-            })
+    # Arquivos independentes são processados em paralelo, limitados a max_workers
+    semaphore = asyncio.Semaphore(settings.max_workers)
+    results = await asyncio.gather(*(_process_upload(file, prints_dir, settings, semaphore) for file in files))
+    for file_aceitos, file_rejeitados in results:
+        aceitos.extend(file_aceitos)
+        rejeitados.extend(file_rejeitados)
+    
+    _prints_index.invalidate()
     
     total_enviados = len(files)
     total_aceitos = len(aceitos)
@@ -318,41 +533,11 @@ async def upload_prints(
     summary="Listar prints",
     description="Lista todos os prints disponíveis"
 )
-async def list_prints(
+def list_prints(
     prints_dir: Path = Depends(get_prints_dir)
 ):
     """Lista todos os prints salvos."""
-    prints = []
-    
-    for ext in ALLOWED_IMAGE_EXTENSIONS:
-        for file_path in prints_dir.glob(f"*{ext}"):
-            prints.append(PrintInfo(
-                filename=file_path.name,
-                contract_number=extract_contract_number(file_path.name),
-                size_bytes=file_path.stat().st_size
-            ))
-        # Também busca extensões em maiúsculas
-        for file_path in prints_dir.glob(f"*{ext.upper()}"):
-            prints.append(PrintInfo(
-                filename=file_path.name,
-                contract_number=extract_contract_number(file_path.name),
-                size_bytes=file_path.stat().st_size
-            ))
-    
-    # Remove duplicatas e ordena
-    seen = set()
-    unique_prints = []
-    for p in prints:
-        if p.filename not in seen:
-            seen.add(p.filename)
-            unique_prints.append(p)
-    
-    unique_prints.sort(key=lambda x: x.contract_number)
-    
-    return PrintListResponse(
-        total=len(unique_prints),
-        prints=unique_prints
-    )
+    return _prints_index.listing(prints_dir)
 
 
 @router.get(
@@ -360,20 +545,21 @@ async def list_prints(
     summary="Obter print",
     description="Obtém a imagem de um contrato específico"
 )
-async def get_print(
+def get_print(
+    request: Request,
     contract_number: str,
     prints_dir: Path = Depends(get_prints_dir)
 ):
     """Obtém o print de um contrato específico."""
-    for ext in ['.png', '.jpg', '.jpeg', '.PNG', '.JPG', '.JPEG']:
-        file_path = prints_dir / f"{contract_number}{ext}"
-        if file_path.exists():
-            media_type = "image/png" if ext.lower() == '.png' else "image/jpeg"
-            return FileResponse(
-                path=str(file_path),
-                filename=file_path.name,
-                media_type=media_type
-            )
+    filenames = _prints_index.lookup(prints_dir, contract_number)
+    if filenames:
+        file_path = prints_dir / filenames[0]
+        media_type = "image/png" if file_path.suffix.lower() == '.png' else "image/jpeg"
+        try:
+            return conditional_file_response(request, file_path, file_path.name, media_type)
+        except FileNotFoundError:
+            # Removido entre a consulta ao índice e o stat
+            pass
     
     raise HTTPException(status_code=404, detail=f"Print do contrato {contract_number} não encontrado")
 
@@ -383,18 +569,20 @@ async def get_print(
     summary="Deletar print",
     description="Remove a imagem de um contrato"
 )
-async def delete_print(
+def delete_print(
     contract_number: str,
     prints_dir: Path = Depends(get_prints_dir)
 ):
     """Remove o print de um contrato."""
     deleted = False
     
-    for ext in ['.png', '.jpg', '.jpeg', '.PNG', '.JPG', '.JPEG']:
-        file_path = prints_dir / f"{contract_number}{ext}"
-        if file_path.exists():
-            file_path.unlink()
+    for filename in _prints_index.lookup(prints_dir, contract_number):
+        try:
+            (prints_dir / filename).unlink()
             deleted = True
+        except FileNotFoundError:
+            pass
+    _prints_index.invalidate()
     
     if not deleted:
         raise HTTPException(status_code=404, detail=f"Print do contrato {contract_number} não encontrado")
@@ -407,18 +595,15 @@ async def delete_print(
     summary="Limpar todos os prints",
     description="Remove todos os prints salvos"
 )
-async def clear_prints(
+def clear_prints(
     prints_dir: Path = Depends(get_prints_dir)
 ):
     """Remove todos os prints."""
     count = 0
     
-    for ext in ALLOWED_IMAGE_EXTENSIONS:
-        for file_path in prints_dir.glob(f"*{ext}"):
-            file_path.unlink()
-            count += 1
-        for file_path in prints_dir.glob(f"*{ext.upper()}"):
-            file_path.unlink()
-            count += 1
+    for entry in iter_print_entries(prints_dir):
+        os.unlink(entry.path)
+        count += 1
+    _prints_index.invalidate()
     
     return {"message": f"{count} print(s) removido(s)"}
@@ -2,8 +2,7 @@
 Endpoints de Templates
 """
 from typing import Optional
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Request
 
 from ...models.schemas import (
     TemplateResponse,
@@ -12,10 +11,18 @@ from ...models.schemas import (
     ErrorResponse
 )
 from ...services.template_service import get_template_service, TemplateService
+from ...services.file_storage import UploadTooLargeError, check_upload_size
 from ...config import get_settings
+from ..responses import conditional_file_response, json_response
 
 router = APIRouter(prefix="/templates", tags=["Templates"])
 
+TEMPLATE_EXTENSION = '.docx'
+
+# Folga para o resto do corpo multipart (delimitadores, cabeçalhos das partes, nome e
+# descrição) no teste pelo Content-Length; o arquivo em si é medido à parte
+MULTIPART_OVERHEAD = 64 * 1024
+
 
 def get_service() -> TemplateService:
     """Dependency injection para o serviço"""
@@ -29,6 +36,7 @@ def get_service() -> TemplateService:
     description="Faz upload de um arquivo Word (.docx) para ser usado como template de contrato"
 )
 async def create_template(
+    request: Request,
     name: str = Form(..., description="Nome identificador do template"),
     description: Optional[str] = Form(None, description="Descrição do template"),
     file: UploadFile = File(..., description="Arquivo Word (.docx)"),
@@ -42,30 +50,33 @@ async def create_template(
     """
     settings = get_settings()
     
+    # Corpo inteiro bem acima do limite: rejeita sem copiar nem abrir o arquivo
+    content_length = request.headers.get('content-length')
+    if content_length and content_length.isdigit() and int(content_length) > settings.max_upload_size + MULTIPART_OVERHEAD:
+        raise HTTPException(status_code=413, detail=str(UploadTooLargeError(settings.max_upload_size)))
+    
     # Valida extensão
-    if not file.filename.lower().endswith('.docx'):
+    if not file.filename.lower().endswith(TEMPLATE_EXTENSION):
         raise HTTPException(
             status_code=400,
             detail="Apenas arquivos .docx são permitidos"
         )
     
-    # Valida tamanho
-    content = await file.read()
-    if len(content) > settings.max_upload_size:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Arquivo muito grande. Máximo: {settings.max_upload_size // (1024*1024)}MB"
+    # Valida tamanho sem carregar o arquivo em memória; a cópia também é limitada
+    try:
+        check_upload_size(file, settings.max_upload_size)
+        
+        # Cria template
+        template = await service.create_template(
+            name=name,
+            file=file.file,
+            original_filename=file.filename,
+            description=description
         )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     
-    # Cria template
-    template = await service.create_template(
-        name=name,
-        file_content=content,
-        original_filename=file.filename,
-        description=description
-    )
-    
-    return TemplateResponse(**template)
+    return json_response(TemplateResponse.model_construct(**template))
 
 
 @router.get(
@@ -80,10 +91,10 @@ async def list_templates(
 ):
     """Lista todos os templates."""
     templates = await service.list_templates(status=status)
-    return TemplateListResponse(
+    return json_response(TemplateListResponse.model_construct(
         total=len(templates),
-        templates=[TemplateResponse(**t) for t in templates]
-    )
+        templates=[TemplateResponse.model_construct(**t) for t in templates]
+    ))
 
 
 @router.get(
@@ -102,7 +113,7 @@ async def get_template(
     if not template:
         raise HTTPException(status_code=404, detail="Template não encontrado")
     
-    return TemplateResponse(**template)
+    return json_response(TemplateResponse.model_construct(**template))
 
 
 @router.put(
@@ -127,7 +138,7 @@ async def update_template(
     if not template:
         raise HTTPException(status_code=404, detail="Template não encontrado")
     
-    return TemplateResponse(**template)
+    return json_response(TemplateResponse.model_construct(**template))
 
 
 @router.delete(
@@ -154,6 +165,7 @@ async def delete_template(
     description="Faz download do arquivo Word do template"
 )
 async def download_template(
+    request: Request,
     template_id: str,
     service: TemplateService = Depends(get_service)
 ):
@@ -168,8 +180,9 @@ async def download_template(
     if not file_path:
         raise HTTPException(status_code=404, detail="Arquivo não encontrado")
     
-    return FileResponse(
-        path=str(file_path),
+    return conditional_file_response(
+        request,
+        file_path,
         filename=template["filename"],
         media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
     )
@@ -0,0 +1,55 @@
+"""
+Respostas HTTP compartilhadas entre os endpoints
+"""
+import os
+from pathlib import Path
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+from pydantic import BaseModel
+
+# Bloco de leitura dos downloads quando o servidor não oferece envio direto do arquivo
+FILE_CHUNK_SIZE = 1 << 20
+
+
+def json_response(model: BaseModel, status_code: int = 200) -> Response:
+    """
+    Serializa o modelo direto para bytes com o encoder do Pydantic, sem
+    revalidar pelo response_model nem passar pelo json da stdlib.
+    
+    Modelos montados com model_construct a partir de dados internos trazem
+    datas já em ISO e enums como str, que são emitidos como estão; por isso
+    os avisos de tipo do serializador são desligados.
+    """
+    return Response(content=model.model_dump_json(warnings=False), status_code=status_code, media_type="application/json")
+
+
+def conditional_file_response(request: Request, path: Path, filename: str, media_type: str) -> Response:
+    """
+    FileResponse com ETag/Last-Modified que responde 304 quando o cliente já tem o arquivo.
+
+    O stat é feito uma única vez e repassado ao FileResponse, que calcula os
+    cabeçalhos a partir dele. Em servidores com a extensão ASGI
+    `http.response.pathsend` o próprio servidor envia o arquivo (sendfile);
+    nos demais, a leitura é feita em blocos de FILE_CHUNK_SIZE.
+    """
+    response = FileResponse(
+        path=str(path),
+        filename=filename,
+        media_type=media_type,
+        stat_result=os.stat(path)
+    )
+    response.chunk_size = FILE_CHUNK_SIZE
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        not_modified = "*" in tags or etag in tags
+    else:
+        not_modified = request.headers.get("if-modified-since") == last_modified
+
+    if not_modified:
+        return Response(status_code=304, headers={"etag": etag, "last-modified": last_modified})
+    return response
@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from typing import Optional
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -15,9 +16,13 @@ class Settings(BaseSettings):
     outputs_dir: Path = storage_dir / "outputs"
     prints_dir: Path = storage_dir / "prints"
     max_upload_size: int = 50 * 1024 * 1024
+    max_print_upload_size: Optional[int] = None  # por arquivo de /prints/upload; None = sem limite
+    max_extract_size: int = 500 * 1024 * 1024
+    max_compression_ratio: int = 200
     allowed_excel_extensions: set = {".xlsx", ".xls"}
     allowed_template_extensions: set = {".docx"}
     max_workers: int = 4
+    job_retention_hours: int = 24  # 0 mantém os jobs indefinidamente
     advogado_nome: str = "João Thomaz Prazeres Gondim"
     advogado_oab: str = "270.757"
     escritorio_telefone: str = "(21) 2262-7979"
@@ -6,18 +6,22 @@ API REST para geração de documentos contratuais a partir de templates Word e d
 
 Desenvolvido para transformar uma aplicação desktop em serviço web.
 """
+import asyncio
 import logging
 from datetime import datetime
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.staticfiles import StaticFiles
+from pydantic_core import to_json
 
 from .config import get_settings
 from .api.endpoints import templates_router, contracts_router, prints_router
+from .api.responses import json_response
+from .services.contract_service import get_contract_service, preload_modules
+from .services.process_pool import shutdown_process_pool
 from .models.schemas import HealthResponse, ErrorResponse
 
 # Configuração de logging
@@ -27,6 +31,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Intervalo entre varreduras de jobs expirados em storage/outputs (segundos)
+JOB_CLEANUP_INTERVAL = 3600
+
+
+async def cleanup_expired_jobs(max_age: float):
+    """Remove periodicamente os jobs mais antigos que a retenção configurada"""
+    service = get_contract_service()
+    while True:
+        try:
+            removidos = await service.cleanup_old_jobs(max_age)
+            if removidos:
+                logger.info(f"🧹 {removidos} job(s) expirado(s) removido(s)")
+        except Exception as e:
+            logger.error(f"Erro na limpeza de jobs: {e}")
+        await asyncio.sleep(min(JOB_CLEANUP_INTERVAL, max_age))
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -38,8 +58,19 @@ async def lifespan(app: FastAPI):
     logger.info(f"📁 Storage: {settings.storage_dir}")
     logger.info(f"🖼️ Prints: {settings.prints_dir}")
     
+    # pandas/core carregam em uma thread enquanto o servidor já atende (/health não espera)
+    asyncio.get_running_loop().run_in_executor(None, preload_modules)
+    
+    cleanup_task = None
+    if settings.job_retention_hours > 0:
+        cleanup_task = asyncio.create_task(cleanup_expired_jobs(settings.job_retention_hours * 3600))
+    
     yield
     
+    if cleanup_task is not None:
+        cleanup_task.cancel()
+    shutdown_process_pool()
+    
     # Shutdown
     logger.info("👋 Aplicação encerrando...")
 
@@ -111,13 +142,13 @@ app.add_middleware(
 async def global_exception_handler(request: Request, exc: Exception):
     """Handler global de exceções"""
     logger.error(f"Erro não tratado: {exc}", exc_info=True)
-    return JSONResponse(
-        status_code=500,
-        content={
-            "error": "Internal Server Error",
-            "detail": str(exc) if settings.debug else "Ocorreu um erro interno",
-            "timestamp": datetime.now().isoformat()
-        }
+    return json_response(
+        ErrorResponse.model_construct(
+            error="Internal Server Error",
+            detail=str(exc) if settings.debug else "Ocorreu um erro interno",
+            timestamp=datetime.now()
+        ),
+        status_code=500
     )
 
 
@@ -128,6 +159,12 @@ app.include_router(contracts_router, prefix="/api/v1")
 
 
 # Health Check
+# Só o timestamp muda entre chamadas; o resto do JSON (mesmo formato do
+# HealthResponse) é montado uma vez
+_HEALTH_PREFIX = b'{"status":"healthy","version":' + to_json(settings.app_version) + b',"timestamp":"'
+_HEALTH_SUFFIX = b'"}'
+
+
 @app.get(
     "/health",
     response_model=HealthResponse,
@@ -137,10 +174,8 @@ app.include_router(contracts_router, prefix="/api/v1")
 )
 async def health_check():
     """Endpoint de health check"""
-    return HealthResponse(
-        status="healthy",
-        version=settings.app_version
-    )
+    timestamp = datetime.now().isoformat().encode()
+    return Response(content=_HEALTH_PREFIX + timestamp + _HEALTH_SUFFIX, media_type="application/json")
 
 
 @app.get(
@@ -3,7 +3,7 @@ Schemas Pydantic - Modelos de Request/Response
 """
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 
 
@@ -111,9 +111,13 @@ class ContractListResponse(BaseModel):
 
 
 # ==================== CONFIGURATION SCHEMAS ====================
+# Nenhuma rota usa estes modelos hoje: o schema do pydantic-core só é montado
+# no primeiro uso (defer_build), não no import.
 
 class ConfigurationBase(BaseModel):
     """Configuração do escritório"""
+    model_config = ConfigDict(defer_build=True)
+    
     advogado_nome: str = "João Thomaz Prazeres Gondim"
     advogado_oab: str = "270.757"
     escritorio_telefone: str = "(21) 2262-7979"
@@ -126,6 +130,8 @@ class ConfigurationBase(BaseModel):
 
 class ConfigurationUpdate(BaseModel):
     """Atualização parcial de configuração"""
+    model_config = ConfigDict(defer_build=True)
+    
     advogado_nome: Optional[str] = None
     advogado_oab: Optional[str] = None
     escritorio_telefone: Optional[str] = None
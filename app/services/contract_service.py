@@ -1,21 +1,143 @@
 
 import os
 import sys
-import uuid
+import json
+import time
+import secrets
 import shutil
 import zipfile
+import threading
+from io import BytesIO
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import TYPE_CHECKING, List, Optional, Dict, Any
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from starlette.concurrency import run_in_threadpool
+
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
-from core.excel_reader import ExcelReader
-from core.document_generator import DocumentGenerator
-from core.validators import VerificadorPendencias
 from ..config import get_settings
 from .template_service import get_template_service
+from .file_storage import atomic_open
+from .process_pool import run_in_process
+
+# pandas e o gerador de documentos são importados só nas rotas que os usam
+if TYPE_CHECKING:
+    from core.excel_reader import ExcelReader
+    from core.document_generator import DocumentGenerator
+    from core.validators import VerificadorPendencias
+
+# Formatos que já são compactados internamente; comprimir de novo só gasta CPU
+ALREADY_COMPRESSED_EXTENSIONS = frozenset({'.docx', '.png', '.jpg', '.jpeg', '.zip'})
+
+# Jobs mantidos em memória; os mais antigos continuam disponíveis pelo job.json
+JOBS_CACHE_SIZE = 256
+
+# Contrato ausente da planilha: entra nos resultados, mas não conta como falha
+CONTRATO_NAO_ENCONTRADO = "Contrato não encontrado"
+
+# Intervalo mínimo (segundos) entre duas gravações do job.json durante o processamento
+JOB_SAVE_INTERVAL = 1.0
+
+
+def is_already_compressed(filename: str) -> bool:
+    return os.path.splitext(filename)[1].lower() in ALREADY_COMPRESSED_EXTENSIONS
+
+
+def _compress_type(filename: str) -> int:
+    return zipfile.ZIP_STORED if is_already_compressed(filename) else zipfile.ZIP_DEFLATED
+
+
+def _coletar_pendencias(linhas, verificador: "VerificadorPendencias") -> tuple[int, int, List[Dict[str, str]]]:
+    """Verifica cada linha da aba de contatos; retorna (total_linhas, contratos_pendentes, pendencias)"""
+    total = 0
+    contratos_pendentes = 0
+    todas_pendencias = []
+    
+    for row in linhas:
+        total += 1
+        valor = row.get('contrato')
+        numero = '' if valor is None else str(valor)
+        if not numero or numero == 'nan':
+            continue
+        
+        pendencias = verificador.verificar_contrato(row, numero)
+        if pendencias:
+            contratos_pendentes += 1
+            # Já vêm com as quatro chaves da resposta; entram sem cópia
+            todas_pendencias.extend(pendencias)
+    
+    return total, contratos_pendentes, todas_pendencias
+
+
+def _verificar_contatos_xlsx(excel_path: Path, verificador: "VerificadorPendencias"):
+    """Lê a aba de contatos em modo read-only, linha a linha, sem montar um DataFrame"""
+    from openpyxl import load_workbook
+    # Mesma conversão de células do core, inclusive os textos que o read_excel lê como vazios
+    from core.processors import _is_aba_contatos, _colunas_xlsx, _linhas_xlsx
+    
+    wb = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        sheet = next((name for name in wb.sheetnames if _is_aba_contatos(name)), None)
+        if sheet is None:
+            return None
+        
+        rows = wb[sheet].iter_rows(values_only=True)
+        header = next(rows, ())
+        
+        # Só as colunas que a verificação consulta; em nomes repetidos vale a primeira
+        colunas = _colunas_xlsx(header, set(verificador.CAMPOS_OBRIGATORIOS) | {'contrato'})
+        
+        if 'contrato' not in colunas:
+            return None
+        
+        return _coletar_pendencias(_linhas_xlsx(rows, colunas), verificador)
+    finally:
+        wb.close()
+
+
+def _verificar_contatos_pandas(excel_path: Path, verificador: "VerificadorPendencias"):
+    """Leitura via pandas, usada para .xls (o openpyxl não lê o formato antigo)"""
+    import pandas as pd
+    from core.processors import _is_aba_contatos
+    
+    xlsx = pd.ExcelFile(excel_path)
+    df_contatos = None
+    
+    try:
+        for sheet in xlsx.sheet_names:
+            if _is_aba_contatos(sheet):
+                df_contatos = pd.read_excel(xlsx, sheet_name=sheet, dtype=str)
+                df_contatos.columns = [str(c).strip().lower() for c in df_contatos.columns]
+                break
+    finally:
+        xlsx.close()
+    
+    if df_contatos is None or 'contrato' not in df_contatos.columns:
+        return None
+    
+    # Linhas como dicts, sem um Series por linha; em nomes repetidos vale a primeira coluna
+    df_contatos = df_contatos.loc[:, ~df_contatos.columns.duplicated()]
+    return _coletar_pendencias(df_contatos.to_dict('records'), verificador)
+
+
+def preload_modules() -> None:
+    """Importa o pandas, o python-docx e o core; chamado em background depois do startup"""
+    import pandas  # noqa: F401
+    import docx  # noqa: F401
+    import core.excel_reader  # noqa: F401
+    import core.document_generator  # noqa: F401
+    import core.validators  # noqa: F401
+
+
+def _gerar_documento(generator: "DocumentGenerator", contrato) -> tuple[bool, str, bytes]:
+    """Executado no pool de processos: gera o documento em memória e devolve os bytes"""
+    buffer = BytesIO()
+    sucesso, msg = generator.gerar(contrato, buffer)
+    return sucesso, msg, buffer.getvalue()
 
 
 class ContractProcessingService:
@@ -27,11 +149,38 @@ class ContractProcessingService:
         self.prints_dir = self.settings.prints_dir
         self.template_service = get_template_service()
 
-        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    
+    def _put_job(self, job: Dict[str, Any]):
+        # LRU limitado: descarta da memória o job menos usado (os arquivos ficam)
+        self.jobs[job["job_id"]] = job
+        self.jobs.move_to_end(job["job_id"])
+        while len(self.jobs) > JOBS_CACHE_SIZE:
+            self.jobs.popitem(last=False)
+    
+    def _job_file(self, job_id: str) -> Path:
+        return self.outputs_dir / job_id / "job.json"
+    
+    def _save_job(self, job: Dict[str, Any]):
+        # Persiste o estado junto aos arquivos do job para que qualquer worker o encontre
+        job_file = self._job_file(job["job_id"])
+        tmp_file = job_file.with_suffix(".tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(job, f, ensure_ascii=False, default=str)
+        os.replace(tmp_file, job_file)
+    
+    def _load_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._job_file(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
     
     async def list_contracts(self, excel_path: Path) -> Dict[str, Any]:
 
         try:
+            from core.excel_reader import ExcelReader
+            
             reader = ExcelReader(str(excel_path))
             contratos = reader.listar_contratos()
             
@@ -56,51 +205,25 @@ class ContractProcessingService:
     ) -> Dict[str, Any]:
 
         try:
-            import pandas as pd
-
+            from core.validators import VerificadorPendencias
+            
             if prints_dir is None:
                 prints_dir = self.prints_dir
             
             verificador = VerificadorPendencias(str(prints_dir) if prints_dir and prints_dir.exists() else None)
             
-            xlsx = pd.ExcelFile(excel_path)
-            df_contatos = None
-            
-            try:
-                for sheet in xlsx.sheet_names:
-                    if 'contato' in sheet.lower() or 'base' in sheet.lower():
-                        df_contatos = pd.read_excel(xlsx, sheet_name=sheet, dtype=str)
-                        df_contatos.columns = [str(c).strip().lower() for c in df_contatos.columns]
-                        break
-            finally:
-                xlsx.close()
+            if excel_path.suffix.lower() == '.xlsx':
+                contagem = _verificar_contatos_xlsx(excel_path, verificador)
+            else:
+                contagem = _verificar_contatos_pandas(excel_path, verificador)
             
-            if df_contatos is None or 'contrato' not in df_contatos.columns:
+            if contagem is None:
                 return {
                     "sucesso": False,
                     "mensagem": "Planilha sem aba de contatos válida"
                 }
             
-            todas_pendencias = []
-            contratos_pendentes = 0
-            
-            for _, row in df_contatos.iterrows():
-                numero = str(row.get('contrato', ''))
-                if not numero or numero == 'nan':
-                    continue
-                
-                pendencias = verificador.verificar_contrato(row, numero)
-                if pendencias:
-                    contratos_pendentes += 1
-                    for p in pendencias:
-                        todas_pendencias.append({
-                            "contrato": p.get("contrato", numero),
-                            "campo": p.get("campo", ""),
-                            "descricao": p.get("descricao", ""),
-                            "observacao": p.get("observacao", "")
-                        })
-            
-            total_contratos = len(df_contatos)
+            total_contratos, contratos_pendentes, todas_pendencias = contagem
             
             return {
                 "sucesso": True,
@@ -121,6 +244,106 @@ class ContractProcessingService:
                 "mensagem": f"Erro ao verificar pendências: {str(e)}"
             }
     
+    def _process_one(
+        self,
+        reader: "ExcelReader",
+        generator: "DocumentGenerator",
+        numero: str,
+        zipf: zipfile.ZipFile,
+        zip_lock: threading.Lock
+    ) -> Dict[str, Any]:
+        """Gera o documento de um contrato (no pool de processos) direto no ZIP do job"""
+        resultado = {
+            "contrato": numero,
+            "sucesso": False,
+            "arquivo": None,
+            "mensagem": "",
+            "dados": {}
+        }
+        
+        try:
+            contrato = reader.obter_contrato(numero)
+            
+            if not contrato:
+                resultado["mensagem"] = CONTRATO_NAO_ENCONTRADO
+            else:
+                resultado["dados"] = {
+                    "inquilinos": len(contrato.inquilinos),
+                    "proprietarios": len(contrato.proprietarios),
+                    "valor_causa": contrato.valor_causa,
+                    "cidade": contrato.cidade
+                }
+                
+                output_filename = f"INICIAL_ARBITRAL_{numero}.docx"
+                
+                sucesso, msg, conteudo = run_in_process(_gerar_documento, generator, contrato)
+                
+                resultado["sucesso"] = sucesso
+                resultado["mensagem"] = msg
+                if sucesso:
+                    with zip_lock:
+                        # Contrato repetido na lista: o ZIP mantém uma única entrada
+                        if output_filename not in zipf.NameToInfo:
+                            zipf.writestr(output_filename, conteudo, compress_type=_compress_type(output_filename))
+                    resultado["arquivo"] = output_filename
+        
+        except Exception as e:
+            resultado["mensagem"] = f"Erro: {str(e)}"
+        
+        return resultado
+    
+    def _gerar_documentos(
+        self,
+        reader: "ExcelReader",
+        generator: "DocumentGenerator",
+        contratos: List[str],
+        job: Dict[str, Any],
+        zip_path: Path
+    ) -> None:
+        """
+        Gera os documentos em paralelo, limitado a max_workers, gravando cada um
+        no ZIP assim que fica pronto (os .docx não passam pelo disco).
+        
+        As threads só leem a planilha e gravam no ZIP; a montagem de cada .docx,
+        presa ao GIL, vai para o pool de processos. O gerador abre o template a
+        cada chamada, então um único DocumentGenerator serve a todos.
+
+        Este método roda numa thread do threadpool (run_in_threadpool) e altera o
+        dict do job à medida que cada contrato termina, enquanto o event loop o lê
+        nas consultas de status. Por isso os contadores são só atribuídos e
+        job["resultados"] é trocado por uma lista nova a cada contrato, nunca
+        alterado no lugar: quem lê vê a lista anterior ou a nova, nunca uma pela
+        metade. Ao final os resultados ficam na ordem da lista de contratos.
+        """
+        resultados: List[Optional[Dict[str, Any]]] = [None] * len(contratos)
+        workers = max(1, min(self.settings.max_workers, len(contratos)))
+        zip_lock = threading.Lock()
+        
+        # O ZIP só aparece no destino depois de fechado
+        with atomic_open(zip_path) as f, \
+                zipfile.ZipFile(f, 'w', zipfile.ZIP_DEFLATED, compresslevel=3) as zipf, \
+                ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._process_one, reader, generator, numero, zipf, zip_lock): i
+                for i, numero in enumerate(contratos)
+            }
+            salvo_em = time.monotonic()
+            for future in as_completed(futures):
+                resultado = future.result()
+                resultados[futures[future]] = resultado
+                if resultado["sucesso"]:
+                    job["sucessos"] += 1
+                elif resultado["mensagem"] != CONTRATO_NAO_ENCONTRADO:
+                    job["falhas"] += 1
+                job["processados"] += 1
+                job["resultados"] = [r for r in resultados if r is not None]
+                # O progresso também vai para o job.json, para os demais workers
+                if time.monotonic() - salvo_em >= JOB_SAVE_INTERVAL:
+                    self._save_job(job)
+                    salvo_em = time.monotonic()
+        
+        job["resultados"] = resultados
+    
     async def process_contracts(
         self,
         excel_path: Path,
@@ -146,9 +369,9 @@ class ContractProcessingService:
                 "mensagem": f"Arquivo do template não encontrado"
             }
         
-        job_id = str(uuid.uuid4())[:12]
+        job_id = secrets.token_hex(6)
         job_output_dir = self.outputs_dir / job_id
-        job_output_dir.mkdir(parents=True, exist_ok=True)
+        job_output_dir.mkdir(parents=True)
         job = {
             "job_id": job_id,
             "status": "processing",
@@ -163,9 +386,15 @@ class ContractProcessingService:
             "mensagem": ""
         }
         
-        self.jobs[job_id] = job
+        self._put_job(job)
         
         try:
+            # Gravado desde já: um job em andamento também é visível aos demais workers
+            self._save_job(job)
+            
+            from core.excel_reader import ExcelReader
+            from core.document_generator import DocumentGenerator
+            
             reader = ExcelReader(str(excel_path))
 
             if contract_numbers:
@@ -174,68 +403,24 @@ class ContractProcessingService:
                 contratos = reader.listar_contratos()
             
             job["total_contratos"] = len(contratos)
+            self._save_job(job)
             
             generator = DocumentGenerator(
                 str(template_path),
                 str(prints_dir) if prints_dir and prints_dir.exists() else None
             )
             
-            resultados = []
-            
-            for numero in contratos:
-                resultado = {
-                    "contrato": numero,
-                    "sucesso": False,
-                    "arquivo": None,
-                    "mensagem": "",
-                    "dados": {}
-                }
-                
-                try:
-                    contrato = reader.obter_contrato(numero)
-                    
-                    if not contrato:
-                        resultado["mensagem"] = "Contrato não encontrado"
-                    else:
-                        resultado["dados"] = {
-                            "inquilinos": len(contrato.inquilinos),
-                            "proprietarios": len(contrato.proprietarios),
-                            "valor_causa": contrato.valor_causa,
-                            "cidade": contrato.cidade
-                        }
-                        
-                        output_filename = f"INICIAL_ARBITRAL_{numero}.docx"
-                        output_path = job_output_dir / output_filename
-                        
-                        sucesso, msg = generator.gerar(contrato, str(output_path))
-                        
-                        resultado["sucesso"] = sucesso
-                        resultado["mensagem"] = msg
-                        if sucesso:
-                            resultado["arquivo"] = output_filename
-                            job["sucessos"] += 1
-                        else:
-                            job["falhas"] += 1
-                
-                except Exception as e:
-                    resultado["mensagem"] = f"Erro: {str(e)}"
-                    job["falhas"] += 1
-                
-                resultados.append(resultado)
-                job["processados"] += 1
-                job["resultados"] = resultados
-            
             zip_filename = f"contratos_{job_id}.zip"
             zip_path = job_output_dir / zip_filename
             
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for file in job_output_dir.glob("*.docx"):
-                    zipf.write(file, file.name)
+            # Os documentos saem em threads; o event loop fica livre para consultas ao job
+            await run_in_threadpool(self._gerar_documentos, reader, generator, contratos, job, zip_path)
             
             job["status"] = "completed"
             job["download_url"] = f"/api/v1/contracts/download/{job_id}"
             job["completed_at"] = datetime.now().isoformat()
             job["mensagem"] = f"Processamento concluído: {job['sucessos']} sucessos, {job['falhas']} falhas"
+            self._save_job(job)
             
             return job
         
@@ -243,10 +428,16 @@ class ContractProcessingService:
             job["status"] = "failed"
             job["mensagem"] = f"Erro no processamento: {str(e)}"
             job["completed_at"] = datetime.now().isoformat()
+            self._save_job(job)
             return job
     
     async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
-        return self.jobs.get(job_id)
+        job = self.jobs.get(job_id)
+        if job is None:
+            # Job processado por outro worker, ou já descartado da memória
+            return self._load_job(job_id)
+        self.jobs.move_to_end(job_id)
+        return job
     
     def get_download_path(self, job_id: str) -> Optional[Path]:
         job_output_dir = self.outputs_dir / job_id
@@ -257,25 +448,44 @@ class ContractProcessingService:
         
         return None
     
+    def _remove_old_job_dirs(self, limite: float, ignorar: set) -> List[str]:
+        removidos = []
+        with os.scandir(self.outputs_dir) as entries:
+            for entry in entries:
+                if entry.name in ignorar or not entry.is_dir():
+                    continue
+                # A idade conta da última gravação do job.json (também feita durante o
+                # processamento); sem ele, da criação do diretório
+                try:
+                    mtime = os.stat(os.path.join(entry.path, "job.json")).st_mtime
+                except OSError:
+                    mtime = entry.stat().st_mtime
+                if mtime < limite:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                    removidos.append(entry.name)
+        return removidos
+    
+    async def cleanup_old_jobs(self, max_age: float) -> int:
+        """Remove os jobs com mais de max_age segundos (exceto os em andamento neste worker)"""
+        em_andamento = {job_id for job_id, job in self.jobs.items() if job["status"] == "processing"}
+        removidos = await run_in_threadpool(self._remove_old_job_dirs, time.time() - max_age, em_andamento)
+        for job_id in removidos:
+            self.jobs.pop(job_id, None)
+        return len(removidos)
+    
     async def cleanup_job(self, job_id: str) -> bool:
         try:
             job_output_dir = self.outputs_dir / job_id
             if job_output_dir.exists():
                 shutil.rmtree(job_output_dir)
             
-            if job_id in self.jobs:
-                del self.jobs[job_id]
+            self.jobs.pop(job_id, None)
             
             return True
         except:
             return False
 
 
-_contract_service: Optional[ContractProcessingService] = None
-
-
+@lru_cache()
 def get_contract_service() -> ContractProcessingService:
-    global _contract_service
-    if _contract_service is None:
-        _contract_service = ContractProcessingService()
-    return _contract_service
+    return ContractProcessingService()
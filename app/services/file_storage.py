@@ -0,0 +1,109 @@
+"""
+Utilitários de gravação de arquivos enviados
+"""
+import os
+import uuid
+import queue
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Buffers de cópia reaproveitados entre uploads (um por cópia em andamento)
+_upload_buffers: "queue.SimpleQueue[bytearray]" = queue.SimpleQueue()
+
+
+class UploadTooLargeError(Exception):
+    """Arquivo enviado acima do tamanho máximo permitido"""
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        super().__init__(f"Arquivo muito grande. Máximo: {limit // (1024*1024)}MB")
+
+
+def copy_fileobj(source: BinaryIO, target: BinaryIO, limit: Optional[int] = None) -> int:
+    """
+    Copia entre arquivos abertos usando um buffer do pool, sem alocar por bloco.
+    
+    Raises:
+        UploadTooLargeError: Se mais de `limit` bytes forem lidos da origem
+    """
+    copied = 0
+    try:
+        buffer = _upload_buffers.get_nowait()
+    except queue.Empty:
+        buffer = bytearray(UPLOAD_CHUNK_SIZE)
+
+    try:
+        with memoryview(buffer) as view:
+            while True:
+                n = source.readinto(view)
+                if not n:
+                    break
+                copied += n
+                if limit is not None and copied > limit:
+                    raise UploadTooLargeError(limit)
+                target.write(view[:n])
+    finally:
+        _upload_buffers.put(buffer)
+    return copied
+
+
+def partial_path(destination: Path) -> Path:
+    """Caminho temporário (.part) ao lado do destino, único por escrita"""
+    return destination.with_name(f"{destination.name}.{uuid.uuid4().hex[:8]}.part")
+
+
+@contextmanager
+def atomic_open(destination: Path):
+    """
+    Abre um arquivo temporário ao lado do destino e, ao final da escrita,
+    renomeia-o para o destino com os.replace.
+    
+    Uma escrita interrompida nunca deixa o destino pela metade; em caso de
+    erro o temporário é removido e o destino anterior (se houver) é mantido.
+    """
+    partial = partial_path(destination)
+    try:
+        with open(partial, "wb") as f:
+            yield f
+        os.replace(partial, destination)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+
+
+def copy_stream(source: BinaryIO, destination: Path, limit: Optional[int] = None) -> None:
+    """Copia um arquivo aberto, desde o início, para o caminho de destino"""
+    source.seek(0)
+    with atomic_open(destination) as f:
+        copy_fileobj(source, f, limit)
+
+
+def upload_size(upload_file: UploadFile) -> int:
+    """Tamanho do upload, sem ler o conteúdo"""
+    if upload_file.size is not None:
+        return upload_file.size
+    # Sem tamanho no multipart: mede pelo fim do spool (fileno() forçaria a ida para o disco)
+    source = upload_file.file
+    position = source.tell()
+    size = source.seek(0, os.SEEK_END)
+    source.seek(position)
+    return size
+
+
+def check_upload_size(upload_file: UploadFile, limit: Optional[int]) -> None:
+    """Rejeita o upload pelo tamanho antes de copiar qualquer byte (sem limite com None)"""
+    if limit is not None and upload_size(upload_file) > limit:
+        raise UploadTooLargeError(limit)
+
+
+async def save_upload_file(upload_file: UploadFile, destination: Path, limit: Optional[int] = None) -> Path:
+    """Grava o upload no destino, fora do event loop, limitado a `limit` bytes"""
+    await run_in_threadpool(copy_stream, upload_file.file, destination, limit)
+    return destination
@@ -0,0 +1,75 @@
+"""
+Pool de processos para o trabalho de CPU do python-docx
+"""
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from ..config import get_settings
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Retorna o pool compartilhado, criado no primeiro uso com max_workers processos.
+
+    A travessia dos documentos no python-docx é Python puro e segura o GIL;
+    em processos separados os documentos são montados em paralelo de verdade.
+    Os processos saem de um forkserver (spawn onde não houver): fazer fork de
+    um worker ASGI já com threads e event loop rodando não é seguro.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                _pool = ProcessPoolExecutor(
+                    max_workers=get_settings().max_workers,
+                    mp_context=multiprocessing.get_context(method)
+                )
+    return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    # Um processo morreu (ex.: falta de memória) e o pool não aceita mais tarefas;
+    # o próximo uso cria um novo
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def run_in_process(fn: Callable[..., Any], *args) -> Any:
+    """Executa fn(*args) no pool, bloqueando a thread atual até o resultado"""
+    pool = get_process_pool()
+    try:
+        return pool.submit(fn, *args).result()
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+
+
+async def run_in_process_async(fn: Callable[..., Any], *args) -> Any:
+    """Executa fn(*args) no pool sem bloquear o event loop"""
+    pool = get_process_pool()
+    try:
+        return await asyncio.wrap_future(pool.submit(fn, *args))
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+
+
+def shutdown_process_pool() -> None:
+    """Encerra o pool (se foi criado); chamado no shutdown da aplicação"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -3,16 +3,68 @@ Serviço de Gerenciamento de Templates
 """
 import os
 import re
-import json
-import uuid
+import secrets
 import shutil
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import BinaryIO, List, Optional, Dict, Any
 
 from docx import Document
+from pydantic_core import from_json, to_json
+from starlette.concurrency import run_in_threadpool
 
 from ..config import get_settings
+from .file_storage import atomic_open, copy_stream
+from .process_pool import run_in_process_async
+
+
+# Padrões comuns de placeholder. Ficam separados (e não numa única alternância)
+# porque se sobrepõem: "XXXXX" dentro de "(...)" também é um placeholder.
+PLACEHOLDER_PATTERNS = (
+    re.compile(r'\([^)]{5,}\)'),  # Texto entre parênteses (min 5 chars)
+    re.compile(r'XXXXX+'),        # Sequências de X
+    re.compile(r'\{[^}]+\}'),     # Texto entre chaves
+)
+
+# A extração para ao encontrar esta quantidade de placeholders distintos
+MAX_PLACEHOLDERS_SCAN = 200
+
+
+def _iter_paragraphs(doc):
+    """
+    Percorre os parágrafos (w:p) do corpo, das tabelas e dos headers/footers.
+    
+    O texto é lido direto do XML (w:p.text), sem criar os objetos
+    Paragraph/Table/_Cell do python-docx. Cada parágrafo é buscado
+    separadamente: "(...)" não pode atravessar parágrafos.
+    """
+    yield from doc.element.body.xpath('./w:p | ./w:tbl/w:tr/w:tc/w:p')
+    for section in doc.sections:
+        yield from section.header.part.element.xpath('./w:p')
+        yield from section.footer.part.element.xpath('./w:p')
+
+
+def _extract_placeholders(file_path: Path) -> List[str]:
+    """Extrai placeholders do documento Word (roda no pool de processos)"""
+    placeholders = set()
+    
+    try:
+        doc = Document(file_path)
+        
+        for p in _iter_paragraphs(doc):
+            text = p.text
+            if text:
+                for pattern in PLACEHOLDER_PATTERNS:
+                    placeholders.update(pattern.findall(text))
+                # Só 50 são devolvidos; não vale varrer o resto de um template enorme
+                if len(placeholders) >= MAX_PLACEHOLDERS_SCAN:
+                    break
+    
+    except Exception as e:
+        print(f"Erro ao extrair placeholders: {e}")
+    
+    return list(placeholders)[:50]  # Limita a 50 placeholders
 
 
 class TemplateService:
@@ -22,6 +74,8 @@ class TemplateService:
         self.settings = get_settings()
         self.templates_dir = self.settings.templates_dir
         self.metadata_file = self.templates_dir / "templates_metadata.json"
+        # ((st_mtime_ns, st_size), metadados) da última leitura/escrita do arquivo
+        self._metadata_cache: Optional[tuple] = None
         self._ensure_metadata_file()
     
     def _ensure_metadata_file(self):
@@ -29,74 +83,37 @@ class TemplateService:
         if not self.metadata_file.exists():
             self._save_metadata({})
     
+    def _metadata_key(self) -> tuple:
+        st = os.stat(self.metadata_file)
+        return (st.st_mtime_ns, st.st_size)
+    
     def _load_metadata(self) -> Dict[str, Any]:
-        """Carrega metadados dos templates"""
+        """
+        Carrega metadados dos templates.
+        
+        O arquivo só é relido quando mtime/tamanho mudam (inclusive por outro
+        processo). Retorna uma cópia rasa: incluir ou remover templates não
+        altera o cache até que _save_metadata seja chamado.
+        """
         try:
-            with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            key = self._metadata_key()
+            if self._metadata_cache is None or self._metadata_cache[0] != key:
+                with open(self.metadata_file, 'rb') as f:
+                    self._metadata_cache = (key, from_json(f.read()))
+            return dict(self._metadata_cache[1])
         except:
             return {}
     
     def _save_metadata(self, metadata: Dict[str, Any]):
-        """Salva metadados dos templates"""
-        with open(self.metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False, default=str)
-    
-    def _extract_placeholders(self, file_path: Path) -> List[str]:
-        """Extrai placeholders do documento Word"""
-        placeholders = set()
-        
-        try:
-            doc = Document(file_path)
-            
-            def find_placeholders(text: str):
-                # Padrões comuns de placeholder
-                patterns = [
-                    r'\([^)]{5,}\)',  # Texto entre parênteses (min 5 chars)
-                    r'XXXXX+',        # Sequências de X
-                    r'\{[^}]+\}',     # Texto entre chaves
-                ]
-                found = []
-                for pattern in patterns:
-                    matches = re.findall(pattern, text)
-                    found.extend(matches)
-                return found
-            
-            # Parágrafos
-            for para in doc.paragraphs:
-                if para.text.strip():
-                    phs = find_placeholders(para.text)
-                    placeholders.update(phs)
-            
-            # Tabelas
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for para in cell.paragraphs:
-                            if para.text.strip():
-                                phs = find_placeholders(para.text)
-                                placeholders.update(phs)
-            
-            # Headers e Footers
-            for section in doc.sections:
-                if section.header:
-                    for para in section.header.paragraphs:
-                        phs = find_placeholders(para.text)
-                        placeholders.update(phs)
-                if section.footer:
-                    for para in section.footer.paragraphs:
-                        phs = find_placeholders(para.text)
-                        placeholders.update(phs)
-        
-        except Exception as e:
-            print(f"Erro ao extrair placeholders: {e}")
-        
-        return list(placeholders)[:50]  # Limita a 50 placeholders
+        """Salva metadados dos templates (escrita atômica: um arquivo truncado perderia todos)"""
+        with atomic_open(self.metadata_file) as f:
+            f.write(to_json(metadata, indent=2, fallback=str))
+        self._metadata_cache = (self._metadata_key(), dict(metadata))
     
     async def create_template(
         self,
         name: str,
-        file_content: bytes,
+        file: BinaryIO,
         original_filename: str,
         description: Optional[str] = None
     ) -> Dict[str, Any]:
@@ -105,7 +122,7 @@ class TemplateService:
         
         Args:
             name: Nome identificador do template
-            file_content: Conteúdo do arquivo
+            file: Arquivo aberto com o conteúdo, copiado em blocos
             original_filename: Nome original do arquivo
             description: Descrição opcional
             
@@ -113,7 +130,7 @@ class TemplateService:
             Dados do template criado
         """
         # Gera ID único
-        template_id = str(uuid.uuid4())[:8]
+        template_id = secrets.token_hex(4)
         
         # Define caminho do arquivo
         file_ext = Path(original_filename).suffix
@@ -121,11 +138,10 @@ class TemplateService:
         file_path = self.templates_dir / new_filename
         
         # Salva arquivo
-        with open(file_path, 'wb') as f:
-            f.write(file_content)
+        await run_in_threadpool(copy_stream, file, file_path, self.settings.max_upload_size)
         
-        # Extrai placeholders
-        placeholders = self._extract_placeholders(file_path)
+        # Extrai placeholders fora do event loop (a leitura do .docx é síncrona)
+        placeholders = await run_in_process_async(_extract_placeholders, file_path)
         
         # Cria metadados
         template_data = {
@@ -175,7 +191,8 @@ class TemplateService:
         if template_id not in metadata:
             return None
         
-        template = metadata[template_id]
+        # Cópia, para não alterar o cache caso a gravação falhe
+        template = dict(metadata[template_id])
         
         if name is not None:
             template["name"] = name
@@ -227,12 +244,7 @@ class TemplateService:
 
 
 # Singleton
-_template_service: Optional[TemplateService] = None
-
-
+@lru_cache()
 def get_template_service() -> TemplateService:
     """Retorna a instância do serviço de templates"""
-    global _template_service
-    if _template_service is None:
-        _template_service = TemplateService()
-    return _template_service
+    return TemplateService()
@@ -1,6 +1,5 @@
 __version__ = "1.0.0"
 
-from .service import ProcessingService
 from .models import Inquilino, Proprietario, Imovel, Contrato
 
 __all__ = [
@@ -10,3 +9,12 @@ __all__ = [
     'Imovel',
     'Contrato'
 ]
+
+
+def __getattr__(name):
+    # ProcessingService puxa os processadores e a configuração; só é importado quando usado, para que
+    # "from core.x import ..." não carregue a pilha inteira
+    if name == 'ProcessingService':
+        from .service import ProcessingService
+        return ProcessingService
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
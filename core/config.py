@@ -1,6 +1,8 @@
-import json
 from pathlib import Path
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Optional
+
+from pydantic_core import from_json, to_json
 
 DEFAULT_CONFIG = {
     "advogado_nome": "João Thomaz Prazeres Gondim",
@@ -15,23 +17,40 @@ DEFAULT_CONFIG = {
 
 CONFIG_FILE = "config.json"
 
+@lru_cache(maxsize=8)
+def _load_cached(config_path: str, versao: Optional[tuple]) -> Dict[str, Any]:
+    # versao = (mtime_ns, tamanho) do arquivo; None quando ele não existe
+    if versao is not None:
+        try:
+            # Bytes direto para o parser em Rust do pydantic-core, sem decodificar antes
+            with open(config_path, 'rb') as f:
+                config = from_json(f.read())
+                return {**DEFAULT_CONFIG, **config}
+        except Exception as e:
+            print(f"Aviso: Erro ao carregar config.json: {e}. Usando padrões.")
+
+    return DEFAULT_CONFIG.copy()
+
+
 def load_config(config_path: str = None) -> Dict[str, Any]:
+    """
+    Carrega a configuração, mesclada aos padrões.
 
+    O arquivo só é relido quando mtime/tamanho mudam; cada chamada recebe uma
+    cópia, que pode ser alterada sem afetar o cache.
+    """
     if config_path is None:
         config_path = CONFIG_FILE
 
     config_file = Path(config_path)
 
-    if config_file.exists():
-        try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                return {**DEFAULT_CONFIG, **config}
-        except Exception as e:
-            print(f"Aviso: Erro ao carregar config.json: {e}. Usando padrões.")
-            return DEFAULT_CONFIG.copy()
+    try:
+        st = config_file.stat()
+        versao = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        versao = None
 
-    return DEFAULT_CONFIG.copy()
+    return dict(_load_cached(str(config_file.resolve()), versao))
 
 
 def save_config(config: Dict[str, Any], config_path: str = None) -> bool:
@@ -41,8 +60,12 @@ def save_config(config: Dict[str, Any], config_path: str = None) -> bool:
 
     try:
         config_file = Path(config_path)
-        with open(config_file, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=4, ensure_ascii=False)
+        # Mesmo formato do json.dump(indent=4, ensure_ascii=False); serializado
+        # antes de abrir, um erro não deixa o arquivo pela metade
+        conteudo = to_json(config, indent=4)
+        with open(config_file, 'wb') as f:
+            f.write(conteudo)
+        _load_cached.cache_clear()
         return True
     except Exception as e:
         print(f"Erro ao salvar config.json: {e}")
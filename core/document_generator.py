@@ -1,47 +1,170 @@
+import os
+import re
 import logging
+import multiprocessing
+from bisect import bisect_right
+from io import BytesIO
+from itertools import accumulate
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Tuple, Optional
-
-from docx import Document
-from docx.shared import Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
+from typing import TYPE_CHECKING, BinaryIO, Callable, Dict, Iterator, List, Tuple, Optional, Union
 
 from .models import Contrato
-from .utils import formatar_valor, valor_por_extenso, formatar_data
-from .config import get_config
+from .utils import formatar_valor, valor_por_extenso, formatar_data, EXTENSOES_IMAGEM
+
+# python-docx só é importado ao gerar (ver _carregar_template); importar o
+# módulo não custa a pilha do docx/lxml
+if TYPE_CHECKING:
+    from docx.document import Document
 
 logger = logging.getLogger(__name__)
 
+# Nome dos documentos gerados em lote
+NOME_ARQUIVO = "INICIAL_ARBITRAL_{numero}.docx"
+
+
+@lru_cache(maxsize=32)
+def _padrao_substituicoes(chaves: Tuple[str, ...]) -> re.Pattern:
+    # Alternância das chaves, da mais longa para a mais curta: numa posição em
+    # que duas casam, vence a maior. Chaves vazias casariam em toda parte.
+    chaves = sorted((c for c in chaves if c), key=len, reverse=True)
+    return re.compile("|".join(map(re.escape, chaves)) or r"(?!)")
+
+
+# (template, versão, padrão) -> índices dos parágrafos com alguma chave; por processo
+_posicoes_substituicao: Dict[tuple, Tuple[int, ...]] = {}
+
+# (template, versão) -> texto de todos os parágrafos do template; por processo
+_textos_template: Dict[tuple, str] = {}
+
+
+@lru_cache(maxsize=8)
+def _ler_template(template_path: str, versao: tuple) -> bytes:
+    # Bytes do .docx guardados por processo (cada worker do pool lê uma vez);
+    # versao = (mtime_ns, tamanho) invalida ao trocar o arquivo
+    with open(template_path, 'rb') as f:
+        return f.read()
+
+
+@lru_cache(maxsize=64)
+def _ler_imagem(img_path: str, versao: tuple) -> bytes:
+    # Mesmo esquema do template: bytes da imagem por processo, invalidados pela versão
+    with open(img_path, 'rb') as f:
+        return f.read()
+
+
+@lru_cache(maxsize=8)
+def _indice_imagens(prints_dir: str, versao: int) -> Dict[str, Path]:
+    # Número do contrato -> imagem, com uma listagem da pasta em vez de um exists()
+    # por extensão e contrato. versao = mtime da pasta, que muda ao incluir ou
+    # remover arquivos. Com dois arquivos para o mesmo número vale a ordem de
+    # EXTENSOES_IMAGEM, como na busca anterior.
+    prioridade = {os.path.normcase(ext): i for i, ext in enumerate(EXTENSOES_IMAGEM)}
+    encontrados: Dict[str, Tuple[int, Path]] = {}
+    for entrada in os.scandir(prints_dir):
+        raiz, ext = os.path.splitext(entrada.name)
+        ordem = prioridade.get(os.path.normcase(ext))
+        if ordem is None:
+            continue
+        chave = os.path.normcase(raiz)
+        if chave not in encontrados or ordem < encontrados[chave][0]:
+            encontrados[chave] = (ordem, Path(entrada.path))
+    return {chave: path for chave, (_, path) in encontrados.items()}
+
+
+def _redistribuir_runs(texto: str, originais: List[str], padrao: re.Pattern,
+                       trocar: Callable[[re.Match], str]) -> List[str]:
+    # Novo texto de cada run: o texto fora das chaves fica no run de origem; cada
+    # substituição vai para o run onde a chave começa e o restante da chave sai
+    # dos runs seguintes
+    limites = list(accumulate(map(len, originais)))
+    pedacos: List[List[str]] = [[] for _ in originais]
+
+    def copiar(inicio: int, fim: int) -> None:
+        i = bisect_right(limites, inicio)
+        while inicio < fim:
+            corte = min(fim, limites[i])
+            pedacos[i].append(texto[inicio:corte])
+            inicio = corte
+            i += 1
+
+    pos = 0
+    for m in padrao.finditer(texto):
+        copiar(pos, m.start())
+        pedacos[bisect_right(limites, m.start())].append(trocar(m))
+        pos = m.end()
+    copiar(pos, len(texto))
+    return ["".join(p) for p in pedacos]
+
+
+def _iter_paragrafos(doc: "Document") -> Iterator:
+    # Corpo, tabelas, cabeçalhos e rodapés, nessa ordem (as posições guardadas em
+    # _posicoes_substituicao dependem dela)
+    yield from doc.paragraphs
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                yield from cell.paragraphs
+    for section in doc.sections:
+        if section.header:
+            yield from section.header.paragraphs
+        if section.footer:
+            yield from section.footer.paragraphs
+
+
+# Gerador de cada processo do pool de gerar_lote, criado uma vez no initializer
+_gerador_worker: Optional["DocumentGenerator"] = None
+
+
+def _iniciar_worker(template_path: str, prints_dir: Optional[str]) -> None:
+    global _gerador_worker
+    _gerador_worker = DocumentGenerator(template_path, prints_dir)
+
+
+def _gerar_no_worker(tarefa: Tuple[Contrato, str]) -> Tuple[bool, str]:
+    contrato, output_path = tarefa
+    return _gerador_worker.gerar(contrato, output_path)
+
 
 class DocumentGenerator:
 
     def __init__(self, template_path: str, prints_dir: str = None):
         self.template_path = Path(template_path)
         self.prints_dir = Path(prints_dir) if prints_dir else None
-        self._template_cache = None
 
-    def _carregar_template(self) -> Document:
-        return Document(self.template_path)
+    def _carregar_template(self) -> "Document":
+        from docx import Document
+
+        st = self.template_path.stat()
+        conteudo = _ler_template(str(self.template_path), (st.st_mtime_ns, st.st_size))
+        return Document(BytesIO(conteudo))
 
     def _buscar_imagem_contrato(self, numero_contrato: str) -> Optional[Path]:
-        if not self.prints_dir or not self.prints_dir.exists():
+        if not self.prints_dir:
             return None
 
-        for ext in ['.png', '.jpg', '.jpeg', '.PNG', '.JPG', '.JPEG']:
-            img_path = self.prints_dir / f"{numero_contrato}{ext}"
-            if img_path.exists():
-                return img_path
+        try:
+            versao = self.prints_dir.stat().st_mtime_ns
+        except OSError:
+            return None
 
-        return None
+        indice = _indice_imagens(str(self.prints_dir), versao)
+        return indice.get(os.path.normcase(str(numero_contrato)))
 
     def _inserir_imagem_no_paragrafo(self, para, img_path: Path, width_inches: float = 5.5) -> bool:
+        from docx.shared import Inches
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
 
         try:
             for run in para.runs:
                 run.text = ""
 
+            st = img_path.stat()
+            conteudo = _ler_imagem(str(img_path), (st.st_mtime_ns, st.st_size))
+
             run = para.add_run()
-            run.add_picture(str(img_path), width=Inches(width_inches))
+            run.add_picture(BytesIO(conteudo), width=Inches(width_inches))
 
             para.alignment = WD_ALIGN_PARAGRAPH.CENTER
 
@@ -50,63 +173,91 @@ class DocumentGenerator:
             logger.warning(f"Erro ao inserir imagem: {e}")
             return False
 
-    def _substituir_texto(self, doc: Document, substituicoes: Dict[str, str]) -> int:
+    def _substituir_texto(self, doc: "Document", substituicoes: Dict[str, str]) -> int:
         total = 0
-
-        for para in doc.paragraphs:
-            total += self._substituir_em_paragrafo(para, substituicoes)
-
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for para in cell.paragraphs:
-                        total += self._substituir_em_paragrafo(para, substituicoes)
-
-        for section in doc.sections:
-            if section.header:
-                for para in section.header.paragraphs:
-                    total += self._substituir_em_paragrafo(para, substituicoes)
-            if section.footer:
-                for para in section.footer.paragraphs:
-                    total += self._substituir_em_paragrafo(para, substituicoes)
+        paragrafos = list(_iter_paragrafos(doc))
+
+        st = self.template_path.stat()
+        versao = (str(self.template_path), st.st_mtime_ns, st.st_size)
+
+        # Chaves que não aparecem em nenhum parágrafo do template nunca casam;
+        # ficam fora do padrão, que fica menor
+        texto = _textos_template.get(versao)
+        if texto is None:
+            if len(_textos_template) >= 8:
+                _textos_template.clear()
+            texto = _textos_template[versao] = "\n".join(p.text for p in paragrafos)
+        padrao = _padrao_substituicoes(tuple(k for k in substituicoes if k in texto))
+        trocar = lambda m: substituicoes[m.group(0)]
+
+        # Quais parágrafos têm chaves só depende do template e das chaves: depois
+        # do primeiro documento, os demais visitam apenas essas posições
+        chave = (*versao, padrao.pattern)
+        posicoes = _posicoes_substituicao.get(chave)
+        if posicoes is not None:
+            paragrafos = [paragrafos[i] for i in posicoes]
+
+        encontrados = []
+        for i, para in enumerate(paragrafos):
+            n = self._substituir_em_paragrafo(para, padrao, trocar)
+            if n:
+                total += n
+                encontrados.append(i)
+
+        if posicoes is None:
+            if len(_posicoes_substituicao) >= 32:
+                _posicoes_substituicao.clear()
+            _posicoes_substituicao[chave] = tuple(encontrados)
 
         return total
 
-    def _substituir_em_paragrafo(self, para, substituicoes: Dict[str, str]) -> int:
+    def _substituir_em_paragrafo(self, para, padrao: re.Pattern, trocar: Callable[[re.Match], str]) -> int:
 
-        total = 0
-        
         texto_original = para.text
         if not texto_original.strip():
             return 0
         
-        texto_esperado = texto_original
-        substituicoes_necessarias = []
-        
-        for antigo, novo in substituicoes.items():
-            if antigo in texto_esperado:
-                count = texto_esperado.count(antigo)
-                substituicoes_necessarias.append((antigo, novo, count))
-                texto_esperado = texto_esperado.replace(antigo, novo)
-                total += count
+        # Uma única passada troca todas as chaves do parágrafo
+        texto_esperado, total = padrao.subn(trocar, texto_original)
         
-        if not substituicoes_necessarias:
+        if not total:
             return 0
         
-        for antigo, novo, _ in substituicoes_necessarias:
-            for run in para.runs:
-                if antigo in run.text:
-                    run.text = run.text.replace(antigo, novo)
+        runs = para.runs
+        originais = []
+        textos = []
+        for run in runs:
+            texto_run = run.text
+            novo = padrao.sub(trocar, texto_run) if texto_run else texto_run
+            if novo != texto_run:
+                run.text = novo
+            originais.append(texto_run)
+            textos.append(novo)
         
         self._limpar_fundo_paragrafo(para)
         
-        if para.text == texto_esperado:
+        # Se os runs cobrem todo o texto do parágrafo, o resultado já é conhecido
+        # sem reler para.text; caso contrário (ex.: hyperlinks), relê
+        cobre = "".join(originais) == texto_original
+        if cobre:
+            texto_final = "".join(textos)
+        else:
+            texto_final = para.text
+        
+        if texto_final == texto_esperado:
             return total
 
-        if para.runs:
+        if cobre:
+            # Alguma chave atravessa runs: só os runs tocados pela chave mudam, os
+            # demais (e a formatação de cada um) ficam como estão
+            for run, atual, novo in zip(runs, textos, _redistribuir_runs(texto_original, originais, padrao, trocar)):
+                if novo != atual:
+                    run.text = novo
+            self._limpar_fundo_paragrafo(para)
+        elif runs:
             formato = None
-            for run in para.runs:
-                if run.text.strip():
+            for run, texto_run in zip(runs, textos):
+                if texto_run.strip():
                     formato = {
                         'bold': run.bold,
                         'italic': run.italic,
@@ -114,13 +265,13 @@ class DocumentGenerator:
                     }
                     break
             
-            for run in para.runs:
+            for run in runs:
                 run.text = ""
             
-            para.runs[0].text = texto_esperado
+            runs[0].text = texto_esperado
             
             if formato:
-                run = para.runs[0]
+                run = runs[0]
                 if formato['bold'] is not None:
                     run.bold = formato['bold']
                 if formato['italic'] is not None:
@@ -162,7 +313,7 @@ class DocumentGenerator:
         except Exception:
             pass
 
-    def gerar(self, contrato: Contrato, output_path: str) -> Tuple[bool, str]:
+    def gerar(self, contrato: Contrato, output_path: Union[str, BinaryIO]) -> Tuple[bool, str]:
 
         try:
             doc = self._carregar_template()
@@ -193,9 +344,25 @@ class DocumentGenerator:
                         img_inserida = self._inserir_imagem_no_paragrafo(para, img_path)
                         break
 
-            output_path = Path(output_path)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            doc.save(str(output_path))
+            # Aceita também um arquivo aberto (ex.: BytesIO) para gerar em memória
+            if isinstance(output_path, (str, Path)):
+                output_path = Path(output_path)
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                # Grava ao lado e renomeia: com processos gerando em paralelo (mesmo
+                # número em duas planilhas), o arquivo final nunca fica misturado, e
+                # uma interrupção (kill, queda de energia) não deixa .docx truncado
+                parcial = output_path.with_name(f"{output_path.name}.{os.getpid()}.part")
+                try:
+                    with open(parcial, 'wb') as f:
+                        doc.save(f)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(parcial, output_path)
+                except BaseException:
+                    parcial.unlink(missing_ok=True)
+                    raise
+            else:
+                doc.save(output_path)
 
             msg = f"Gerado com {total} substituições"
             if img_inserida:
@@ -206,59 +373,87 @@ class DocumentGenerator:
         except Exception as e:
             return False, str(e)
 
+    def gerar_lote(self, contratos: List[Contrato], output_dir: Union[str, Path],
+                   max_workers: Optional[int] = None) -> Iterator[Tuple[Contrato, bool, str, str]]:
+        """
+        Gera um documento por contrato em output_dir, em processos separados.
+
+        A montagem no python-docx é Python puro e segura o GIL, então threads
+        não paralelizam a geração. Cada processo monta seu próprio gerador no
+        initializer e lê o template uma vez (cache por processo). Os processos
+        saem de um forkserver (spawn onde não houver), como no pool da API.
+
+        Yields:
+            (contrato, sucesso, mensagem, caminho), na ordem de `contratos`
+        """
+        output_dir = Path(output_dir)
+        tarefas = [(c, str(output_dir / NOME_ARQUIVO.format(numero=c.numero))) for c in contratos]
+
+        # Com um processo só (um contrato, max_workers=1 ou uma CPU), subir o pool
+        # custa mais que gerar aqui mesmo
+        workers = min(max_workers or os.cpu_count() or 1, len(tarefas))
+        if workers <= 1:
+            for contrato, caminho in tarefas:
+                yield (contrato, *self.gerar(contrato, caminho), caminho)
+            return
+
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        prints_dir = str(self.prints_dir) if self.prints_dir else None
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(method),
+            initializer=_iniciar_worker,
+            initargs=(str(self.template_path), prints_dir)
+        ) as executor:
+            resultados = executor.map(_gerar_no_worker, tarefas, chunksize=4)
+            for (contrato, caminho), (sucesso, msg) in zip(tarefas, resultados):
+                yield contrato, sucesso, msg, caminho
+
     def _montar_substituicoes(self, c: Contrato) -> Dict[str, str]:
 
+        from .config import get_config
+
         subs = {}
         config = get_config()
 
         if c.proprietarios:
             blocos_props = []
-            for i, prop in enumerate(c.proprietarios):
+            for prop in c.proprietarios:
                 nacionalidade = "brasileiro(a)"
 
-                bloco = f"{prop.nome.upper()}, {nacionalidade}, inscrito(a) no CPF sob o nº {prop.cpf or '(inserir o CPF do locador)'}"
+                # Partes do bloco unidas uma vez no final, sem += a cada trecho
+                partes = [
+                    prop.nome.upper(), ", ", nacionalidade,
+                    ", inscrito(a) no CPF sob o nº ", prop.cpf or "(inserir o CPF do locador)"
+                ]
 
                 if prop.rg:
-                    bloco += f" e no RG nº {prop.rg}"
+                    partes += (" e no RG nº ", prop.rg)
 
                 endereco = prop.endereco or "(incluir endereço completo do locador)"
-                bloco += f", residente e domiciliado(a) à {endereco}"
+                partes += (", residente e domiciliado(a) à ", endereco)
 
                 email = prop.email or "(inserir o e-mail)"
-                bloco += f", com endereço eletrônico {email}"
+                partes += (", com endereço eletrônico ", email)
 
-                blocos_props.append(bloco)
+                blocos_props.append("".join(partes))
 
-            if len(blocos_props) > 1:
-                bloco_completo_props = ", e ".join(blocos_props)
-            else:
-                bloco_completo_props = blocos_props[0]
+            bloco_completo_props = ", e ".join(blocos_props)
 
             bloco_template_locador = "NOME COMPLETO DO LOCADOR,  inscrito(a) no CPF sob o n.º (inserir o CPF do locador), residente e domiciliado(a) à (incluir endereço completo do locador: Rua/Avenida, número, complemento, Cidade, UF e CEP), com endereço eletrônico (inserir o e-mail)"
             subs[bloco_template_locador] = bloco_completo_props
 
         if c.inquilinos:
-            inq1 = c.inquilinos[0]
-
-            bloco_inq1 = (
-                f"{inq1.nome.upper()}, ({inq1.nacionalidade}),  "
-                f"inscrito(a) no CPF sob o n.º {inq1.cpf or '(inserir o CPF do Inquilino)'}, "
-                f"Telefone {inq1.telefone or '(DDD) (número do whatsapp do Inquilino)'}, "
-                f"e-mail(s) {inq1.email or '(inserir o endereço eletrônico do Inquilino)'}"
+            # O modelo tem lugar para dois inquilinos
+            bloco_completo = " e ".join(
+                f"{inq.nome.upper()}, ({inq.nacionalidade}),  "
+                f"inscrito(a) no CPF sob o n.º {inq.cpf or '(inserir o CPF do Inquilino)'}, "
+                f"Telefone {inq.telefone or '(DDD) (número do whatsapp do Inquilino)'}, "
+                f"e-mail(s) {inq.email or '(inserir o endereço eletrônico do Inquilino)'}"
+                for inq in c.inquilinos[:2]
             )
 
-            if len(c.inquilinos) > 1:
-                inq2 = c.inquilinos[1]
-                bloco_inq2 = (
-                    f" e {inq2.nome.upper()}, ({inq2.nacionalidade}),  "
-                    f"inscrito(a) no CPF sob o n.º {inq2.cpf or '(inserir o CPF do Inquilino)'}, "
-                    f"Telefone {inq2.telefone or '(DDD) (número do whatsapp do Inquilino)'}, "
-                    f"e-mail(s) {inq2.email or '(inserir o endereço eletrônico do Inquilino)'}"
-                )
-                bloco_completo = bloco_inq1 + bloco_inq2
-            else:
-                bloco_completo = bloco_inq1
-
             bloco_template = "(NOME DO INQUILINO), (nacionalidade),  inscrito(a) no CPF sob o n.º (inserir o CPF do Inqulino), Telefone (DDD) (número do whatsapp do Inquilino), e-mail(s) (inserir o endereço eletrônico do Inquiino) e (NOME DO INQUILINO), (nacionalidade),  inscrito(a) no CPF sob o n.º (inserir o CPF do Inqulino), Telefone (DDD) (número do whatsapp do Inquilino), e-mail(s) (inserir o endereço eletrônico do Inquilino)"
             subs[bloco_template] = bloco_completo
 
@@ -1,50 +1,214 @@
 import logging
 from pathlib import Path
-from typing import List, Optional
-
-import pandas as pd
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Mapping, Optional
 
 from .models import Contrato, Inquilino, Proprietario, Imovel
 from .utils import formatar_cpf, formatar_telefone, limpar_texto, separar_valores
 
+# O pandas só é importado ao ler uma planilha (ver ExcelReader._carregar)
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
+# Leitor em Rust (python-calamine; o requirements.txt já exige o pandas >= 2.2 que o
+# aceita como engine); num ambiente sem ele, o padrão do pandas (openpyxl já em modo
+# read_only para .xlsx, xlrd para .xls)
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE: Optional[str] = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = None
+
+COLUNAS_VALOR = (
+    'valor_aluguel',
+    'valor_condominio',
+    'valor_iptu',
+    'valor_seguro_incendio',
+    'valor_historico',
+    'valor_atualizado',
+)
+
+# Colunas efetivamente usadas de cada aba (nomes já normalizados com strip/lower)
+CONTATOS_COLS = frozenset((
+    'contrato',
+    'nome inqs', 'email inqs', 'tel inqs', 'cpf_iqs',
+    'nome pps', 'email pps', 'tel pp', 'cpf_pps', 'rg_pps', 'endereco_pps',
+    'cidade',
+) + COLUNAS_VALOR)
+
+ENDERECO_COLS = frozenset((
+    'contract',
+    'house_address',
+    'house_complement',
+    'house_neighborhood',
+    'house_city',
+    'house_zipcode',
+))
+
+
+def _registros_por_chave(df: "pd.DataFrame", chave: str) -> Dict[str, Dict[str, Any]]:
+    # Uma linha {coluna: valor} por contrato; se o número se repete vale a primeira linha,
+    # como no .loc anterior, e em nome de coluna repetido vale a primeira coluna.
+    # Linhas sem número (NaN) não são alcançáveis por obter_contrato e ficam de fora
+    indices: Dict[str, int] = {}
+    for i, nome in enumerate(df.columns):
+        indices.setdefault(nome, i)
+    if chave not in indices:
+        return {}
+    i = indices[chave]
+    registros: Dict[str, Dict[str, Any]] = {}
+    for row in df.itertuples(index=False, name=None):
+        if isinstance(row[i], str) and row[i] not in registros:
+            registros[row[i]] = {nome: row[j] for nome, j in indices.items()}
+    return registros
+
+
+def _valor_numerico(valor: Any) -> float:
+    # Mesma regra do pd.to_numeric(errors='coerce').fillna(0.0) sobre a célula como texto:
+    # vazio, texto não numérico (ex.: "1.234,56") e NaN viram 0.0
+    if isinstance(valor, bool):
+        return 0.0
+    if isinstance(valor, (int, float)):
+        numero = float(valor)
+    elif isinstance(valor, str) and valor.isascii() and '_' not in valor:
+        try:
+            numero = float(valor)
+        except ValueError:
+            return 0.0
+    else:
+        return 0.0
+    return 0.0 if numero != numero else numero
+
+
+def montar_contrato(numero: str, contatos: Mapping[str, Any],
+                    endereco: Optional[Mapping[str, Any]] = None) -> Contrato:
+    """
+    Monta o Contrato a partir de uma linha já lida da aba de contatos e,
+    se houver, da linha do imóvel na aba de endereços.
+
+    As linhas são mapeamentos {coluna normalizada: valor da célula}; colunas
+    ausentes contam como vazias. Não depende do pandas: serve tanto ao
+    ExcelReader quanto à leitura em streaming do processamento em lote.
+    """
+    contrato = Contrato(numero=numero)
+
+    nomes_inqs = separar_valores(limpar_texto(contatos.get('nome inqs', '')))
+    emails_inqs = separar_valores(limpar_texto(contatos.get('email inqs', '')))
+    tels_inqs = separar_valores(limpar_texto(contatos.get('tel inqs', '')))
+    cpfs_inqs = separar_valores(limpar_texto(contatos.get('cpf_iqs', '')))
+
+    nacionalidade_padrao = "brasileiro(a)"
+
+    for i, nome in enumerate(nomes_inqs):
+        inq = Inquilino(
+            nome=nome,
+            cpf=formatar_cpf(cpfs_inqs[i] if i < len(cpfs_inqs) else ""),
+            telefone=formatar_telefone(tels_inqs[i] if i < len(tels_inqs) else (tels_inqs[0] if tels_inqs else "")),
+            email=emails_inqs[i] if i < len(emails_inqs) else (emails_inqs[0] if emails_inqs else ""),
+            nacionalidade=nacionalidade_padrao
+        )
+        contrato.inquilinos.append(inq)
+
+    nomes_pps = separar_valores(limpar_texto(contatos.get('nome pps', '')))
+    emails_pps = separar_valores(limpar_texto(contatos.get('email pps', '')))
+    tels_pps = separar_valores(limpar_texto(contatos.get('tel pp', '')))
+    cpfs_pps = separar_valores(limpar_texto(contatos.get('cpf_pps', '')))
+    rgs_pps = separar_valores(limpar_texto(contatos.get('rg_pps', '')))
+    enderecos_pps = separar_valores(limpar_texto(contatos.get('endereco_pps', '')))
+
+    for i, nome in enumerate(nomes_pps):
+        prop = Proprietario(
+            nome=nome,
+            cpf=formatar_cpf(cpfs_pps[i] if i < len(cpfs_pps) else (cpfs_pps[0] if cpfs_pps else "")),
+            rg=rgs_pps[i] if i < len(rgs_pps) else (rgs_pps[0] if rgs_pps else ""),
+            email=emails_pps[i] if i < len(emails_pps) else (emails_pps[0] if emails_pps else ""),
+            telefone=formatar_telefone(tels_pps[i] if i < len(tels_pps) else (tels_pps[0] if tels_pps else "")),
+            endereco=enderecos_pps[i] if i < len(enderecos_pps) else (enderecos_pps[0] if enderecos_pps else "")
+        )
+        contrato.proprietarios.append(prop)
+
+    if endereco is not None:
+        contrato.imovel = Imovel(
+            endereco=limpar_texto(endereco.get('house_address', '')),
+            complemento=limpar_texto(endereco.get('house_complement', '')),
+            bairro=limpar_texto(endereco.get('house_neighborhood', '')),
+            cidade=limpar_texto(endereco.get('house_city', '')),
+            cep=limpar_texto(endereco.get('house_zipcode', ''))
+        )
+
+    contrato.cidade = limpar_texto(contatos.get('cidade', '')) or "São Paulo"
+
+    contrato.valor_aluguel = _valor_numerico(contatos.get('valor_aluguel'))
+    contrato.valor_condominio = _valor_numerico(contatos.get('valor_condominio'))
+    contrato.valor_iptu = _valor_numerico(contatos.get('valor_iptu'))
+    contrato.valor_seguro = _valor_numerico(contatos.get('valor_seguro_incendio'))
+    contrato.valor_historico = _valor_numerico(contatos.get('valor_historico'))
+    contrato.valor_atualizado = _valor_numerico(contatos.get('valor_atualizado'))
+
+    return contrato
+
 
 class ExcelReader:
 
     def __init__(self, filepath: str):
 
         self.filepath = Path(filepath)
-        self.df_endereco: pd.DataFrame = None
-        self.df_contatos: pd.DataFrame = None
+        self.df_endereco: Optional["pd.DataFrame"] = None
+        self.df_contatos: Optional["pd.DataFrame"] = None
+        self._contatos_por_numero: Dict[str, Dict[str, Any]] = {}
+        self._endereco_por_numero: Dict[str, Dict[str, Any]] = {}
         self._carregar()
 
     def _carregar(self):
+        import pandas as pd
+
         logger.info(f"Carregando planilha: {self.filepath}")
 
-        xlsx = pd.ExcelFile(self.filepath)
+        xlsx = pd.ExcelFile(self.filepath, engine=EXCEL_ENGINE)
 
         try:
             for sheet in xlsx.sheet_names:
-                df = pd.read_excel(xlsx, sheet_name=sheet, dtype=str)
+                nome = sheet.lower()
+                is_endereco = 'endere' in nome
+                # Só as abas usadas são lidas; as demais nem chegam ao parser
+                if not is_endereco and 'contato' not in nome and 'base' not in nome:
+                    continue
+
+                # Só as colunas usadas são lidas; o nome do cabeçalho é comparado normalizado.
+                # As de valor também vêm como str e são convertidas abaixo com to_numeric,
+                # que tolera texto na célula (um dtype float faria a leitura falhar)
+                colunas = ENDERECO_COLS if is_endereco else CONTATOS_COLS
+                df = pd.read_excel(
+                    xlsx,
+                    sheet_name=sheet,
+                    dtype=str,
+                    usecols=lambda c, colunas=colunas: str(c).strip().lower() in colunas
+                )
                 df.columns = [str(c).strip().lower() for c in df.columns]
 
-                if 'endere' in sheet.lower():
+                if is_endereco:
                     self.df_endereco = df
-                    logger.info(f"  Aba '{sheet}': {len(df)} linhas")
-                elif 'contato' in sheet.lower() or 'base' in sheet.lower():
+                else:
                     self.df_contatos = df
-                    logger.info(f"  Aba '{sheet}': {len(df)} linhas")
+                logger.info(f"  Aba '{sheet}': {len(df)} linhas")
         finally:
             xlsx.close()
 
-        if self.df_endereco is not None and 'contract' in self.df_endereco.columns:
-            self.df_endereco['contract'] = self.df_endereco['contract'].astype(str)
-            self.df_endereco.set_index('contract', inplace=True, drop=False)
-
-        if self.df_contatos is not None and 'contrato' in self.df_contatos.columns:
-            self.df_contatos['contrato'] = self.df_contatos['contrato'].astype(str)
-            self.df_contatos.set_index('contrato', inplace=True, drop=False)
+        if self.df_endereco is not None:
+            if 'contract' in self.df_endereco.columns:
+                self.df_endereco['contract'] = self.df_endereco['contract'].astype(str)
+            self._endereco_por_numero = _registros_por_chave(self.df_endereco, 'contract')
+
+        if self.df_contatos is not None:
+            if 'contrato' in self.df_contatos.columns:
+                self.df_contatos['contrato'] = self.df_contatos['contrato'].astype(str)
+            # Conversão numérica feita uma vez por coluna; inválidos e vazios viram 0.0
+            for col in COLUNAS_VALOR:
+                if col in self.df_contatos.columns:
+                    self.df_contatos[col] = pd.to_numeric(self.df_contatos[col], errors='coerce').fillna(0.0)
+            # Linhas em dicts, uma passada só; a busca por número vira um acesso ao dict
+            self._contatos_por_numero = _registros_por_chave(self.df_contatos, 'contrato')
 
     def listar_contratos(self) -> List[str]:
 
@@ -56,81 +220,17 @@ class ExcelReader:
 
         numero = str(numero)
 
-        if self.df_contatos is None or numero not in self.df_contatos.index:
+        row_contatos = self._contatos_por_numero.get(numero)
+        if row_contatos is None:
             logger.warning(f"Contrato {numero} não encontrado em Base Contatos")
             return None
 
-        row_contatos = self.df_contatos.loc[numero]
-        if isinstance(row_contatos, pd.DataFrame):
-            row_contatos = row_contatos.iloc[0]
-
-        row_endereco = None
-        if self.df_endereco is not None and numero in self.df_endereco.index:
-            row_endereco = self.df_endereco.loc[numero]
-            if isinstance(row_endereco, pd.DataFrame):
-                row_endereco = row_endereco.iloc[0]
-
-        contrato = Contrato(numero=numero)
-
-        nomes_inqs = separar_valores(limpar_texto(row_contatos.get('nome inqs', '')))
-        emails_inqs = separar_valores(limpar_texto(row_contatos.get('email inqs', '')))
-        tels_inqs = separar_valores(limpar_texto(row_contatos.get('tel inqs', '')))
-        cpfs_inqs = separar_valores(limpar_texto(row_contatos.get('cpf_iqs', '')))
-
-        nacionalidade_padrao = "brasileiro(a)"
-
-        for i, nome in enumerate(nomes_inqs):
-            inq = Inquilino(
-                nome=nome,
-                cpf=formatar_cpf(cpfs_inqs[i] if i < len(cpfs_inqs) else ""),
-                telefone=formatar_telefone(tels_inqs[i] if i < len(tels_inqs) else (tels_inqs[0] if tels_inqs else "")),
-                email=emails_inqs[i] if i < len(emails_inqs) else (emails_inqs[0] if emails_inqs else ""),
-                nacionalidade=nacionalidade_padrao
-            )
-            contrato.inquilinos.append(inq)
-
-        nomes_pps = separar_valores(limpar_texto(row_contatos.get('nome pps', '')))
-        emails_pps = separar_valores(limpar_texto(row_contatos.get('email pps', '')))
-        tels_pps = separar_valores(limpar_texto(row_contatos.get('tel pp', '')))
-        cpfs_pps = separar_valores(limpar_texto(row_contatos.get('cpf_pps', '')))
-        rgs_pps = separar_valores(limpar_texto(row_contatos.get('rg_pps', '')))
-        enderecos_pps = separar_valores(limpar_texto(row_contatos.get('endereco_pps', '')))
-
-        for i, nome in enumerate(nomes_pps):
-            prop = Proprietario(
-                nome=nome,
-                cpf=formatar_cpf(cpfs_pps[i] if i < len(cpfs_pps) else (cpfs_pps[0] if cpfs_pps else "")),
-                rg=rgs_pps[i] if i < len(rgs_pps) else (rgs_pps[0] if rgs_pps else ""),
-                email=emails_pps[i] if i < len(emails_pps) else (emails_pps[0] if emails_pps else ""),
-                telefone=formatar_telefone(tels_pps[i] if i < len(tels_pps) else (tels_pps[0] if tels_pps else "")),
-                endereco=enderecos_pps[i] if i < len(enderecos_pps) else (enderecos_pps[0] if enderecos_pps else "")
-            )
-            contrato.proprietarios.append(prop)
-
-        if row_endereco is not None:
-            contrato.imovel = Imovel(
-                endereco=limpar_texto(row_endereco.get('house_address', '')),
-                complemento=limpar_texto(row_endereco.get('house_complement', '')),
-                bairro=limpar_texto(row_endereco.get('house_neighborhood', '')),
-                cidade=limpar_texto(row_endereco.get('house_city', '')),
-                cep=limpar_texto(row_endereco.get('house_zipcode', ''))
-            )
-
-        contrato.cidade = limpar_texto(row_contatos.get('cidade', '')) or "São Paulo"
-
-        def safe_float(val):
-            try:
-                if pd.isna(val) or val is None or val == '':
-                    return 0.0
-                return float(val)
-            except:
-                return 0.0
-
-        contrato.valor_aluguel = safe_float(row_contatos.get('valor_aluguel', 0))
-        contrato.valor_condominio = safe_float(row_contatos.get('valor_condominio', 0))
-        contrato.valor_iptu = safe_float(row_contatos.get('valor_iptu', 0))
-        contrato.valor_seguro = safe_float(row_contatos.get('valor_seguro_incendio', 0))
-        contrato.valor_historico = safe_float(row_contatos.get('valor_historico', 0))
-        contrato.valor_atualizado = safe_float(row_contatos.get('valor_atualizado', 0))
-
-        return contrato
+        return self._montar_contrato(numero, row_contatos)
+
+    def iter_contratos(self) -> Iterator[Contrato]:
+        """Todos os contratos da planilha, na ordem de listar_contratos"""
+        for numero, row_contatos in self._contatos_por_numero.items():
+            yield self._montar_contrato(numero, row_contatos)
+
+    def _montar_contrato(self, numero: str, row_contatos: Dict[str, Any]) -> Contrato:
+        return montar_contrato(numero, row_contatos, self._endereco_por_numero.get(numero))
@@ -7,10 +7,10 @@ Dataclasses que representam as entidades do domínio.
 """
 
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Inquilino:
     """Representa um inquilino/locatário"""
     nome: str = ""
@@ -20,7 +20,7 @@ class Inquilino:
     nacionalidade: str = "brasileiro(a)"
 
 
-@dataclass
+@dataclass(slots=True)
 class Proprietario:
     """Representa um proprietário/locador"""
     nome: str = ""
@@ -31,7 +31,7 @@ class Proprietario:
     endereco: str = ""  # Coluna endereco_pps
 
 
-@dataclass
+@dataclass(slots=True)
 class Imovel:
     """Representa um imóvel"""
     endereco: str = ""
@@ -39,10 +39,14 @@ class Imovel:
     bairro: str = ""
     cidade: str = ""
     cep: str = ""
+    # Memo de endereco_completo; o imóvel não muda depois de lido da planilha
+    _endereco_completo: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     @property
     def endereco_completo(self) -> str:
-        """Retorna endereço completo formatado"""
+        """Retorna endereço completo formatado (calculado no primeiro acesso)"""
+        if self._endereco_completo is not None:
+            return self._endereco_completo
         partes = []
         if self.endereco:
             partes.append(self.endereco)
@@ -54,10 +58,11 @@ class Imovel:
             partes.append(self.cidade)
         if self.cep:
             partes.append(f"CEP {self.cep}")
-        return ", ".join(partes) if partes else ""
+        self._endereco_completo = ", ".join(partes) if partes else ""
+        return self._endereco_completo
 
 
-@dataclass
+@dataclass(slots=True)
 class Contrato:
     """Representa um contrato de locação"""
     numero: str = ""
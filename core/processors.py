@@ -6,25 +6,228 @@ Gerador de Iniciais Arbitrais
 Classes responsáveis por processar contratos e gerar documentos.
 """
 
+import os
+import pickle
 import logging
+import tempfile
+import time
+import multiprocessing
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict
-from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+from datetime import date, datetime, time as dt_time
 
-import pandas as pd
-
-from .excel_reader import ExcelReader
-from .document_generator import DocumentGenerator
+from .excel_reader import ExcelReader, CONTATOS_COLS, ENDERECO_COLS, EXCEL_ENGINE, montar_contrato
+from .document_generator import DocumentGenerator, NOME_ARQUIVO
+from .models import Contrato
 from .validators import VerificadorPendencias
 
 logger = logging.getLogger(__name__)
 
+# Intervalo mínimo (segundos) entre dois logs de progresso
+INTERVALO_PROGRESSO = 2.0
+
+# Colunas da aba 'Pendências' do relatório, na ordem das tuplas guardadas
+CAMPOS_PENDENCIA = ('arquivo', 'contrato', 'campo', 'descricao', 'observacao')
+
+
+def _iniciar_log_worker(nivel: int) -> None:
+    # Processos novos (forkserver/spawn) não herdam a configuração de log do pai
+    logging.basicConfig(level=nivel)
+
+
+def _is_aba_contatos(nome: str) -> bool:
+    nome = nome.lower()
+    return 'contato' in nome or 'base' in nome
+
+
+# Textos que o read_excel (na_values padrão do pandas) lê como célula vazia
+TEXTOS_VAZIOS = frozenset((
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+))
+
+
+def _valor_celula(valor):
+    # Mesma conversão do read_excel: números inteiros em float viram int ("1000", não "1000.0")
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+
+def _linhas_xlsx(rows, colunas: Dict[str, int]) -> Iterator[Dict]:
+    # Linhas vazias no meio contam como linhas (como no DataFrame); as do final são descartadas
+    vazias = 0
+    for values in rows:
+        if all(v is None for v in values):
+            vazias += 1
+            continue
+        for _ in range(vazias):
+            yield {}
+        vazias = 0
+        yield {
+            nome: _valor_celula(values[i])
+            for nome, i in colunas.items()
+            if i < len(values) and values[i] is not None and values[i] not in TEXTOS_VAZIOS
+        }
+
+
+def _is_aba_endereco(nome: str) -> bool:
+    return 'endere' in nome.lower()
+
+
+def _aba_contatos(nomes: List[str]) -> Optional[str]:
+    # Mesma escolha do ExcelReader: 'endere' é testado antes (ex.: 'Base Endereços' é
+    # de endereços) e, entre várias abas de contatos, vale a última
+    return next((nome for nome in reversed(nomes) if not _is_aba_endereco(nome) and _is_aba_contatos(nome)), None)
+
+
+def _enderecos_por_numero(linhas: Iterator[Mapping]) -> Dict[str, Mapping]:
+    # Como no ExcelReader: se o número se repete vale a primeira linha; sem número fica de fora
+    enderecos: Dict[str, Mapping] = {}
+    for row in linhas:
+        numero = row.get('contract')
+        if numero is not None and numero == numero:
+            enderecos.setdefault(str(numero), row)
+    return enderecos
+
+
+def _colunas_xlsx(header, usadas: Set[str]) -> Dict[str, int]:
+    # Em nomes repetidos vale a primeira coluna
+    colunas: Dict[str, int] = {}
+    for i, nome in enumerate(header):
+        nome = str(nome).strip().lower()
+        if nome in usadas:
+            colunas.setdefault(nome, i)
+    return colunas
+
+
+def _linhas_calamine(rows) -> Iterator[Tuple]:
+    # Células como o openpyxl as devolve: vazias como None (o calamine usa '') e datas
+    # sem hora como datetime
+    for values in rows:
+        yield tuple(
+            None if v == '' else datetime.combine(v, dt_time.min) if type(v) is date else v
+            for v in values
+        )
+
+
+def _ler_abas(nomes: List[str], linhas_da_aba: Callable[[str], Iterator[Tuple]], usadas: Set[str],
+              com_enderecos: bool) -> Optional[Tuple[Iterator[Mapping], Dict[str, Mapping]]]:
+    # Escolhe as abas e monta o par (linhas de contatos, endereços) de _abrir_planilha;
+    # linhas_da_aba(nome) percorre as linhas da aba como tuplas, com None nas células vazias
+    sheet = _aba_contatos(nomes)
+    if sheet is None:
+        return None
+
+    rows = linhas_da_aba(sheet)
+    colunas = _colunas_xlsx(next(rows, ()), usadas)
+    if 'contrato' not in colunas:
+        return None
+
+    # A aba de endereços é pequena perto da de contatos e vai inteira para um dict,
+    # antes das linhas de contatos (o modo read-only lê uma aba por vez).
+    # Como no ExcelReader, vale a última aba de endereços
+    enderecos = {}
+    sheet_endereco = None
+    if com_enderecos:
+        sheet_endereco = next((nome for nome in reversed(nomes) if _is_aba_endereco(nome)), None)
+    if sheet_endereco is not None:
+        rows_endereco = linhas_da_aba(sheet_endereco)
+        colunas_endereco = _colunas_xlsx(next(rows_endereco, ()), ENDERECO_COLS)
+        if 'contract' in colunas_endereco:
+            enderecos = _enderecos_por_numero(_linhas_xlsx(rows_endereco, colunas_endereco))
+
+    return _linhas_xlsx(rows, colunas), enderecos
+
+
+@contextmanager
+def _abrir_planilha(excel_path: Path, usadas: Set[str],
+                    com_enderecos: bool = True) -> Iterator[Optional[Tuple[Iterator[Mapping], Dict[str, Mapping]]]]:
+    """
+    Linhas da aba de contatos, uma por vez, como mapeamentos {coluna: valor},
+    junto com as linhas da aba de endereços indexadas pelo número do contrato
+    (vazio com com_enderecos=False, quando não se vai gerar documentos).
+
+    Só as colunas em `usadas` (contatos) e ENDERECO_COLS (endereços) entram nas
+    linhas. Com o python-calamine instalado, .xlsx e .xls são lidos por ele (em
+    Rust); sem ele, .xlsx vai pelo openpyxl em modo read-only e .xls (que o
+    openpyxl não lê) pelo pandas. Produz None se não houver aba de contatos com
+    a coluna 'contrato'.
+    """
+    if EXCEL_ENGINE == 'calamine':
+        from python_calamine import CalamineWorkbook
+
+        # Aberto pelo conteúdo, não pela extensão (como no pandas): um .xlsx salvo
+        # como .xls continua legível
+        with open(excel_path, 'rb') as f:
+            wb = CalamineWorkbook.from_filelike(f)
+            try:
+                yield _ler_abas(
+                    wb.sheet_names,
+                    lambda nome: _linhas_calamine(wb.get_sheet_by_name(nome).iter_rows()),
+                    usadas,
+                    com_enderecos
+                )
+            finally:
+                wb.close()
+        return
+
+    if excel_path.suffix.lower() == '.xls':
+        # pandas só é importado aqui; a leitura .xlsx e o relatório não passam por ele
+        import pandas as pd
+
+        xlsx = pd.ExcelFile(excel_path)
+        try:
+            sheet = _aba_contatos(xlsx.sheet_names)
+            df_contatos = None
+            df_endereco = None
+            if sheet is not None:
+                # Só as colunas usadas passam pelo parser, como na leitura .xlsx
+                df_contatos = pd.read_excel(
+                    xlsx, sheet_name=sheet, dtype=str,
+                    usecols=lambda c: str(c).strip().lower() in usadas
+                )
+                df_contatos.columns = [str(c).strip().lower() for c in df_contatos.columns]
+                # Como no ExcelReader, vale a última aba de endereços
+                sheet_endereco = None
+                if com_enderecos:
+                    sheet_endereco = next((nome for nome in reversed(xlsx.sheet_names) if _is_aba_endereco(nome)), None)
+                if sheet_endereco is not None:
+                    df_endereco = pd.read_excel(
+                        xlsx, sheet_name=sheet_endereco, dtype=str,
+                        usecols=lambda c: str(c).strip().lower() in ENDERECO_COLS
+                    )
+                    df_endereco.columns = [str(c).strip().lower() for c in df_endereco.columns]
+        finally:
+            xlsx.close()
+
+        if df_contatos is None or 'contrato' not in df_contatos.columns:
+            yield None
+        else:
+            enderecos = {}
+            if df_endereco is not None and 'contract' in df_endereco.columns:
+                enderecos = _enderecos_por_numero(df_endereco.to_dict('records'))
+            # Dicts simples em vez de uma Series por linha (iterrows)
+            yield iter(df_contatos.to_dict('records')), enderecos
+        return
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        yield _ler_abas(wb.sheetnames, lambda nome: wb[nome].iter_rows(values_only=True), usadas, com_enderecos)
+    finally:
+        wb.close()
+
 
 class ProcessadorIniciais:
     """Processador principal de iniciais arbitrais"""
 
-    def __init__(self, excel_path: str, template_path: str, output_dir: str = "output", prints_dir: str = None):
+    def __init__(self, excel_path: str, template_path: str, output_dir: str = "output", prints_dir: str = None,
+                 pular_existentes: bool = False, reader: Optional[ExcelReader] = None):
         """
         Inicializa o processador
 
@@ -33,12 +236,16 @@ class ProcessadorIniciais:
             template_path: Caminho do template Word
             output_dir: Diretório de saída
             prints_dir: Pasta com imagens das cláusulas (opcional)
+            pular_existentes: Não regera documentos que já existem em output_dir
+                (retomar um processamento interrompido)
+            reader: ExcelReader já carregado de excel_path (opcional; ex.: do cache do serviço)
         """
-        self.reader = ExcelReader(excel_path)
+        self.reader = reader if reader is not None else ExcelReader(excel_path)
         self.generator = DocumentGenerator(template_path, prints_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.prints_dir = Path(prints_dir) if prints_dir else None
+        self.pular_existentes = pular_existentes
 
         self.resultados = []
 
@@ -52,6 +259,30 @@ class ProcessadorIniciais:
         Returns:
             Dicionário com resultado do processamento
         """
+        # Obtém dados
+        contrato = self.reader.obter_contrato(numero)
+        resultado = self._novo_resultado(numero, contrato)
+        if not contrato:
+            return resultado
+
+        # Gera documento
+        output_path = self.output_dir / NOME_ARQUIVO.format(numero=numero)
+        if self._ja_existe(output_path):
+            self._registrar_geracao(resultado, True, "Documento já existe", str(output_path))
+            return resultado
+
+        sucesso, msg = self.generator.gerar(contrato, str(output_path))
+        self._registrar_geracao(resultado, sucesso, msg, str(output_path))
+
+        return resultado
+
+    def _ja_existe(self, output_path: Path) -> bool:
+        # Documentos só chegam ao nome final já completos (.part + os.replace no
+        # gerador), então um arquivo existente é um documento inteiro
+        return self.pular_existentes and output_path.exists()
+
+    @staticmethod
+    def _novo_resultado(numero: str, contrato: Optional[Contrato]) -> Dict:
         resultado = {
             "contrato": numero,
             "sucesso": False,
@@ -60,8 +291,6 @@ class ProcessadorIniciais:
             "dados": {}
         }
 
-        # Obtém dados
-        contrato = self.reader.obter_contrato(numero)
         if not contrato:
             resultado["mensagem"] = "Contrato não encontrado"
             return resultado
@@ -73,57 +302,83 @@ class ProcessadorIniciais:
             "valor_causa": contrato.valor_causa,
             "cidade": contrato.cidade
         }
+        return resultado
 
-        # Gera documento
-        output_path = self.output_dir / f"INICIAL_ARBITRAL_{numero}.docx"
-        sucesso, msg = self.generator.gerar(contrato, str(output_path))
-
+    @staticmethod
+    def _registrar_geracao(resultado: Dict, sucesso: bool, msg: str, caminho: str) -> None:
         resultado["sucesso"] = sucesso
         resultado["mensagem"] = msg
         if sucesso:
-            resultado["arquivo"] = str(output_path)
-
-        return resultado
+            resultado["arquivo"] = caminho
 
-    def processar_todos(self, max_workers: int = 4) -> List[Dict]:
+    def processar_todos(self, max_workers: Optional[int] = 4) -> List[Dict]:
         """
         Processa todos os contratos (com paralelismo)
 
         Args:
-            max_workers: Número de threads para processamento paralelo
+            max_workers: Número de processos para processamento paralelo (None = número de CPUs)
 
         Returns:
             Lista de resultados
         """
+        self.resultados = list(self.iter_todos(max_workers))
+        return self.resultados
+
+    def iter_todos(self, max_workers: Optional[int] = 4) -> Iterator[Dict]:
+        """
+        Como processar_todos, mas entrega cada resultado assim que fica pronto,
+        sem acumulá-los (nem em self.resultados)
+        """
         contratos = self.reader.listar_contratos()
         total = len(contratos)
 
         logger.info(f"Processando {total} contratos...")
 
-        self.resultados = []
         processados = 0
-
-        # Processa em paralelo para melhor performance
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(self.processar_contrato, num): num for num in contratos}
-
-            for future in as_completed(futures):
-                resultado = future.result()
-                self.resultados.append(resultado)
+        sucessos = 0
+
+        # A planilha é lida aqui; só a geração dos documentos vai para os processos
+        lote = []
+        pendentes = []
+        for num in contratos:
+            contrato = self.reader.obter_contrato(num)
+            resultado = self._novo_resultado(num, contrato)
+            output_path = self.output_dir / NOME_ARQUIVO.format(numero=num)
+            if contrato and self._ja_existe(output_path):
+                self._registrar_geracao(resultado, True, "Documento já existe", str(output_path))
                 processados += 1
-
-                # Log de progresso a cada 100 contratos
-                if processados % 100 == 0 or processados == total:
+                sucessos += 1
+                yield resultado
+            elif contrato:
+                lote.append(contrato)
+                pendentes.append(resultado)
+            else:
+                processados += 1
+                yield resultado
+
+        # Log de progresso por tempo (no máximo um a cada INTERVALO_PROGRESSO) e no fim;
+        # com INFO desligado nem o relógio é consultado
+        log_progresso = logger.isEnabledFor(logging.INFO)
+        ultimo_log = time.monotonic()
+
+        gerados = self.generator.gerar_lote(lote, self.output_dir, max_workers)
+        for resultado, (_, sucesso, msg, caminho) in zip(pendentes, gerados):
+            self._registrar_geracao(resultado, sucesso, msg, caminho)
+            processados += 1
+            sucessos += sucesso
+            yield resultado
+
+            if log_progresso:
+                agora = time.monotonic()
+                if processados == total or agora - ultimo_log >= INTERVALO_PROGRESSO:
                     logger.info(f"  Progresso: {processados}/{total} ({100*processados//total}%)")
+                    ultimo_log = agora
 
         # Resumo
-        sucessos = sum(1 for r in self.resultados if r["sucesso"])
         falhas = total - sucessos
 
         logger.info(f"Concluído: {sucessos} sucessos, {falhas} falhas")
 
-        return self.resultados
-
     def processar_lista(self, numeros: List[str]) -> List[Dict]:
         """
         Processa uma lista específica de contratos
@@ -134,23 +389,31 @@ class ProcessadorIniciais:
         Returns:
             Lista de resultados
         """
-        self.resultados = []
+        self.resultados = list(self.iter_lista(numeros))
+        return self.resultados
+
+    def iter_lista(self, numeros: Iterable[str]) -> Iterator[Dict]:
+        """Como processar_lista, mas entrega cada resultado assim que fica pronto"""
+        # A linha de cada contrato só é montada se o INFO estiver ligado
+        log_contratos = logger.isEnabledFor(logging.INFO)
 
         for num in numeros:
             resultado = self.processar_contrato(num)
-            self.resultados.append(resultado)
+            yield resultado
 
-            status = "✓" if resultado["sucesso"] else "✗"
-            logger.info(f"  [{status}] Contrato {num}: {resultado['mensagem']}")
-
-        return self.resultados
+            if log_contratos:
+                status = "✓" if resultado["sucesso"] else "✗"
+                logger.info(f"  [{status}] Contrato {num}: {resultado['mensagem']}")
 
 
 class ProcessadorLote:
     """Processa múltiplos arquivos Excel de uma pasta"""
 
+    # Contadores de cada arquivo somados nas estatísticas do lote
+    CHAVES_ESTATISTICAS = ('contratos_total', 'contratos_completos', 'contratos_pendentes', 'documentos_gerados')
+
     def __init__(self, excel_dir: str, template_path: str, output_dir: str = "output",
-                 prints_dir: str = None, pendencias_dir: str = "pendencias"):
+                 prints_dir: str = None, pendencias_dir: str = "pendencias", gerar_documentos: bool = True):
         """
         Inicializa o processador de lote
 
@@ -160,19 +423,26 @@ class ProcessadorLote:
             output_dir: Diretório de saída
             prints_dir: Pasta com imagens das cláusulas (opcional)
             pendencias_dir: Diretório para relatórios de pendências
+            gerar_documentos: Se False, só verifica as pendências (sem gerar documentos)
         """
         self.excel_dir = Path(excel_dir)
         self.template_path = Path(template_path)
         self.output_dir = Path(output_dir)
         self.prints_dir = Path(prints_dir) if prints_dir else None
         self.pendencias_dir = Path(pendencias_dir)
+        self.gerar_documentos = gerar_documentos
 
         # Cria diretórios
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.pendencias_dir.mkdir(parents=True, exist_ok=True)
 
         self.verificador = VerificadorPendencias(prints_dir)
-        self.todas_pendencias = []
+        self.generator = DocumentGenerator(str(self.template_path), prints_dir)
+        # Pendências de cada arquivo já processado, em disco (um pickle por arquivo)
+        # até o relatório: a memória fica com as de um arquivo por vez
+        self._pendencias_spool = None
+        self._pendencias_por_arquivo: Dict[str, List[int]] = defaultdict(list)
+        self.total_pendencias = 0
         self.estatisticas = {
             'arquivos_processados': 0,
             'contratos_total': 0,
@@ -188,19 +458,31 @@ class ProcessadorLote:
         Returns:
             Lista de caminhos de arquivos Excel
         """
-        arquivos = set()  # Usa set para evitar duplicatas
-        for ext in ['*.xlsx', '*.xls']:
-            arquivos.update(self.excel_dir.glob(ext))
-        # Filtra arquivos temporários do Excel (começam com ~$)
-        arquivos = [a for a in arquivos if not a.name.startswith('~$')]
-        return sorted(arquivos)
-
-    def processar_arquivo(self, excel_path: Path) -> Dict:
+        # Uma única listagem da pasta (cada entrada aparece uma vez, sem set);
+        # filtra arquivos temporários do Excel (começam com ~$)
+        arquivos = []
+        try:
+            with os.scandir(self.excel_dir) as entradas:
+                for entrada in entradas:
+                    nome = entrada.name
+                    if nome.startswith('~$') or not nome.endswith(('.xlsx', '.xls')):
+                        continue
+                    if entrada.is_file():
+                        arquivos.append(Path(entrada.path))
+        except (FileNotFoundError, NotADirectoryError):
+            # Como no glob: pasta inexistente não tem arquivos
+            return []
+        arquivos.sort()
+        return arquivos
+
+    def processar_arquivo(self, excel_path: Path, max_workers: Optional[int] = 1) -> Dict:
         """
         Processa um arquivo Excel e retorna estatísticas
 
         Args:
             excel_path: Caminho do arquivo Excel
+            max_workers: Processos para gerar os documentos do arquivo
+                (1 = no processo atual; None = número de CPUs)
 
         Returns:
             Dicionário com estatísticas do processamento
@@ -217,53 +499,22 @@ class ProcessadorLote:
         }
 
         try:
-            # Carrega planilha
-            xlsx = pd.ExcelFile(excel_path)
-            df_contatos = None
-
-            for sheet in xlsx.sheet_names:
-                if 'contato' in sheet.lower() or 'base' in sheet.lower():
-                    df_contatos = pd.read_excel(xlsx, sheet_name=sheet, dtype=str)
-                    df_contatos.columns = [str(c).strip().lower() for c in df_contatos.columns]
-                    break
-
-            if df_contatos is None or 'contrato' not in df_contatos.columns:
-                logger.warning(f"  ⚠️ Planilha sem aba de contatos válida")
-                return resultado
-
-            resultado['contratos_total'] = len(df_contatos)
-
-            # Processa cada contrato
-            processador = ProcessadorIniciais(
-                str(excel_path),
-                str(self.template_path),
-                str(self.output_dir),
-                str(self.prints_dir) if self.prints_dir else None
-            )
-
-            for _, row in df_contatos.iterrows():
-                numero = str(row.get('contrato', ''))
-                if not numero or numero == 'nan':
-                    continue
-
-                # Verifica pendências (para relatório)
-                pendencias = self.verificador.verificar_contrato(row, numero)
-
-                if pendencias:
-                    # Contrato com pendências - registra no relatório
-                    resultado['contratos_pendentes'] += 1
-                    for p in pendencias:
-                        p['arquivo'] = excel_path.name
-                        resultado['pendencias'].append(p)
-                        self.todas_pendencias.append(p)
-                else:
-                    # Contrato completo
-                    resultado['contratos_completos'] += 1
-
-                # SEMPRE gera documento (mesmo com pendências)
-                res = processador.processar_contrato(numero)
-                if res['sucesso']:
-                    resultado['documentos_gerados'] += 1
+            # Carrega planilha (só verificando, bastam as colunas obrigatórias e não há endereços)
+            usadas = set(self.verificador.CAMPOS_OBRIGATORIOS) | {'contrato'}
+            if self.gerar_documentos:
+                usadas |= CONTATOS_COLS
+            with _abrir_planilha(excel_path, usadas, self.gerar_documentos) as planilha:
+                if planilha is None:
+                    logger.warning(f"  ⚠️ Planilha sem aba de contatos válida")
+                    return resultado
+
+                linhas, enderecos = planilha
+                contratos, ocorrencias = self._processar_linhas(excel_path, linhas, enderecos, resultado)
+
+            # A planilha já foi fechada; a geração (python-docx, CPU) vai para os processos
+            for contrato, sucesso, _, _ in self.generator.gerar_lote(contratos, self.output_dir, max_workers):
+                if sucesso:
+                    resultado['documentos_gerados'] += ocorrencias[contrato.numero]
 
             logger.info(f"  ✓ {resultado['documentos_gerados']} documentos gerados, {resultado['contratos_pendentes']} com pendências")
 
@@ -272,9 +523,53 @@ class ProcessadorLote:
 
         return resultado
 
-    def processar_todos(self) -> Dict:
+    def _processar_linhas(self, excel_path: Path, linhas: Iterator[Mapping], enderecos: Dict[str, Mapping],
+                          resultado: Dict) -> Tuple[List[Contrato], Counter]:
+        # Cada linha é lida uma vez só: a mesma linha serve à verificação e ao Contrato
+        # a gerar, sem reler a planilha num ExcelReader
+        contratos: Dict[str, Contrato] = {}
+        ocorrencias: Counter = Counter()
+
+        for row in linhas:
+            resultado['contratos_total'] += 1
+            # Célula vazia: ausente na linha (calamine/openpyxl) ou NaN (pandas, no .xls).
+            # O texto 'nan' também fica de fora, como o pandas o leria
+            numero = row.get('contrato')
+            if numero is None or numero != numero or numero in ('', 'nan'):
+                continue
+            numero = str(numero)
+
+            # Verifica pendências (para relatório)
+            pendencias = self.verificador.verificar_contrato(row, numero)
+
+            if pendencias:
+                # Contrato com pendências - registra no relatório
+                resultado['contratos_pendentes'] += 1
+                for p in pendencias:
+                    p['arquivo'] = excel_path.name
+                    resultado['pendencias'].append(p)
+            else:
+                # Contrato completo
+                resultado['contratos_completos'] += 1
+
+            if not self.gerar_documentos:
+                continue
+
+            # SEMPRE gera documento (mesmo com pendências). Número repetido gera o
+            # mesmo documento (vale a primeira linha): é gerado uma vez e contado em cada linha
+            if numero not in contratos:
+                contratos[numero] = montar_contrato(numero, row, enderecos.get(numero))
+            ocorrencias[numero] += 1
+
+        return list(contratos.values()), ocorrencias
+
+    def processar_todos(self, max_workers: Optional[int] = None) -> Dict:
         """
-        Processa todos os arquivos Excel da pasta
+        Processa todos os arquivos Excel da pasta (um processo por arquivo; com
+        um arquivo só, os processos geram os documentos desse arquivo)
+
+        Args:
+            max_workers: Número de processos (padrão: número de CPUs)
 
         Returns:
             Dicionário com estatísticas finais
@@ -287,54 +582,142 @@ class ProcessadorLote:
 
         logger.info(f"📁 Encontrados {len(arquivos)} arquivos Excel")
 
-        for arquivo in arquivos:
-            resultado = self.processar_arquivo(arquivo)
-
-            self.estatisticas['arquivos_processados'] += 1
-            self.estatisticas['contratos_total'] += resultado['contratos_total']
-            self.estatisticas['contratos_completos'] += resultado['contratos_completos']
-            self.estatisticas['contratos_pendentes'] += resultado['contratos_pendentes']
-            self.estatisticas['documentos_gerados'] += resultado['documentos_gerados']
-
-        # Gera relatório de pendências
-        if self.todas_pendencias:
+        workers = min(max_workers or os.cpu_count() or 1, len(arquivos))
+        if workers <= 1:
+            # Um arquivo só (ou max_workers=1): os processos vão para os documentos do arquivo
+            for arquivo in arquivos:
+                resultado = self.processar_arquivo(arquivo, max_workers)
+                self._guardar_pendencias(resultado)
+                self._somar_estatisticas(resultado)
+        else:
+            # Os arquivos são independentes e a geração (python-docx) segura o GIL:
+            # cada arquivo vai para um processo. Os resultados voltam na ordem dos arquivos.
+            # Cada arquivo gera numa pasta própria e os documentos são movidos para
+            # output_dir nessa ordem: contrato repetido em duas planilhas fica com o
+            # documento da última, como no processamento sequencial
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            with tempfile.TemporaryDirectory(prefix='.lote_', dir=self.output_dir) as temp_dir, ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(method),
+                initializer=_iniciar_log_worker,
+                initargs=(logging.getLogger().getEffectiveLevel(),)
+            ) as executor:
+                pastas = [Path(temp_dir) / str(i) for i in range(len(arquivos))]
+                for resultado, pasta in zip(executor.map(self._processar_em_pasta, arquivos, pastas), pastas):
+                    self._mover_documentos(pasta)
+                    self._guardar_pendencias(resultado)
+                    self._somar_estatisticas(resultado)
+
+        # Gera relatório de pendências e descarta o spool
+        if self.total_pendencias:
             self.gerar_relatorio_pendencias()
+        self._descartar_pendencias()
 
         return self.estatisticas
 
+    def _processar_em_pasta(self, excel_path: Path, pasta: Path) -> Dict:
+        # Roda no processo filho, sobre a cópia do processador: só ela passa a gerar em `pasta`
+        pasta.mkdir()
+        self.output_dir = pasta
+        return self.processar_arquivo(excel_path)
+
+    def _mover_documentos(self, pasta: Path) -> None:
+        # Mesmo sistema de arquivos (a pasta fica dentro de output_dir): só renomeia
+        with os.scandir(pasta) as entradas:
+            for entrada in entradas:
+                os.replace(entrada.path, self.output_dir / entrada.name)
+
+    def __getstate__(self) -> Dict:
+        # Os processos do lote recebem o processador sem o spool (um arquivo aberto
+        # só existe no processo pai); as pendências deles voltam no resultado
+        estado = self.__dict__.copy()
+        estado['_pendencias_spool'] = None
+        estado['_pendencias_por_arquivo'] = defaultdict(list)
+        estado['total_pendencias'] = 0
+        return estado
+
+    def _guardar_pendencias(self, resultado: Dict) -> None:
+        # Grava as pendências do arquivo no spool (arquivo temporário anônimo) e
+        # esvazia a lista do resultado
+        pendencias = resultado['pendencias']
+        if not pendencias:
+            return
+        if self._pendencias_spool is None:
+            self._pendencias_spool = tempfile.TemporaryFile()
+
+        spool = self._pendencias_spool
+        spool.seek(0, os.SEEK_END)
+        self._pendencias_por_arquivo[resultado['arquivo']].append(spool.tell())
+        pickle.dump([tuple(p[c] for c in CAMPOS_PENDENCIA) for p in pendencias], spool, pickle.HIGHEST_PROTOCOL)
+        self.total_pendencias += len(pendencias)
+        resultado['pendencias'] = []
+
+    def _linhas_pendencias(self) -> Iterator[Tuple]:
+        # Linhas do relatório ordenadas por arquivo, contrato e campo (estável, como o
+        # sort_values), lendo do spool um arquivo por vez
+        spool = self._pendencias_spool
+        for arquivo in sorted(self._pendencias_por_arquivo):
+            linhas = []
+            for posicao in self._pendencias_por_arquivo[arquivo]:
+                spool.seek(posicao)
+                linhas.extend(pickle.load(spool))
+            linhas.sort(key=lambda linha: linha[1:3])
+            yield from linhas
+
+    def _descartar_pendencias(self) -> None:
+        if self._pendencias_spool is not None:
+            self._pendencias_spool.close()
+            self._pendencias_spool = None
+        self._pendencias_por_arquivo.clear()
+
+    def _somar_estatisticas(self, resultado: Dict) -> None:
+        estatisticas = self.estatisticas
+        estatisticas['arquivos_processados'] += 1
+        for chave in self.CHAVES_ESTATISTICAS:
+            estatisticas[chave] += resultado[chave]
+
     def gerar_relatorio_pendencias(self):
         """Gera arquivo Excel com todas as pendências"""
-        if not self.todas_pendencias:
+        if not self.total_pendencias:
             return
 
-        df = pd.DataFrame(self.todas_pendencias)
-        df = df[['arquivo', 'contrato', 'campo', 'descricao', 'observacao']]
-        df.columns = ['Arquivo Origem', 'Contrato', 'Campo', 'Descrição', 'Observação']
-
-        # Ordena por arquivo e contrato
-        df = df.sort_values(['Arquivo Origem', 'Contrato', 'Campo'])
+        from openpyxl import Workbook
 
         # Nome do arquivo com data
         data_str = datetime.now().strftime('%Y-%m-%d_%H%M%S')
         output_path = self.pendencias_dir / f"PENDENCIAS_{data_str}.xlsx"
 
-        # Salva Excel
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Pendências', index=False)
-
-            # Resumo por arquivo
-            resumo = df.groupby('Arquivo Origem').agg({
-                'Contrato': 'nunique',
-                'Campo': 'count'
-            }).reset_index()
-            resumo.columns = ['Arquivo', 'Contratos com Pendência', 'Total de Pendências']
-            resumo.to_excel(writer, sheet_name='Resumo', index=False)
-
-            # Resumo por tipo de pendência
-            por_tipo = df.groupby('Descrição').size().reset_index(name='Quantidade')
-            por_tipo = por_tipo.sort_values('Quantidade', ascending=False)
-            por_tipo.to_excel(writer, sheet_name='Por Tipo', index=False)
+        # Salva Excel em modo write-only: as linhas vão direto para o arquivo
+        wb = Workbook(write_only=True)
+
+        # Resumos na mesma passada que escreve as linhas, sem DataFrame/groupby
+        contratos_por_arquivo = defaultdict(set)
+        pendencias_por_arquivo = Counter()
+        por_tipo = Counter()
+
+        ws = wb.create_sheet('Pendências')
+        ws.append(['Arquivo Origem', 'Contrato', 'Campo', 'Descrição', 'Observação'])
+        for linha in self._linhas_pendencias():
+            ws.append(linha)
+            arquivo, contrato, _, descricao, _ = linha
+            contratos_por_arquivo[arquivo].add(contrato)
+            pendencias_por_arquivo[arquivo] += 1
+            por_tipo[descricao] += 1
+
+        # Resumo por arquivo
+        ws = wb.create_sheet('Resumo')
+        ws.append(['Arquivo', 'Contratos com Pendência', 'Total de Pendências'])
+        for arquivo in sorted(contratos_por_arquivo):
+            ws.append((arquivo, len(contratos_por_arquivo[arquivo]), pendencias_por_arquivo[arquivo]))
+
+        # Resumo por tipo de pendência (empates na ordem alfabética, como no groupby)
+        ws = wb.create_sheet('Por Tipo')
+        ws.append(['Descrição', 'Quantidade'])
+        for descricao, quantidade in sorted(sorted(por_tipo.items()), key=lambda item: -item[1]):
+            ws.append((descricao, quantidade))
+
+        wb.save(output_path)
 
         logger.info(f"\n📊 Relatório de pendências gerado: {output_path}")
-        logger.info(f"   Total de pendências: {len(self.todas_pendencias)}")
-        logger.info(f"   Contratos afetados: {df['Contrato'].nunique()}")
+        logger.info(f"   Total de pendências: {self.total_pendencias}")
+        logger.info(f"   Contratos afetados: {len(set().union(*contratos_por_arquivo.values()))}")
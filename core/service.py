@@ -3,418 +3,660 @@
 Camada de Serviço - Core
 Gerador de Iniciais Arbitrais
 
-Classe de serviço que expõe a API pública do core.
-Esta é a única interface que deve ser usada por aplicações externas (GUI, CLI, API Web).
+Funções de serviço que expõem a API pública do core, reunidas também em
+ProcessingService. Esta é a única interface que deve ser usada por aplicações
+externas (GUI, CLI, API Web).
 """
 
+import os
+import json
+import stat
+import inspect
+import hashlib
 import logging
-from typing import Dict, List, Optional, Any
+import threading
+import time
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
 
-from .processors import ProcessadorIniciais, ProcessadorLote
+from .excel_reader import ExcelReader
+from .processors import ProcessadorIniciais, ProcessadorLote, _abrir_planilha
+from .validators import VerificadorPendencias
 from .config import get_config, save_config, update_config
 
 logger = logging.getLogger(__name__)
 
 
-class ProcessingService:
-    """
-    Serviço principal para processamento de iniciais arbitrais.
-
-    Esta classe fornece uma interface de alto nível, independente de implementação,
-    facilitando a integração com diferentes tipos de interface (GUI, CLI, API REST).
-    """
-
-    @staticmethod
-    def processar_contrato_unico(
-        excel_path: str,
-        template_path: str,
-        numero_contrato: str,
-        output_dir: str = "output",
-        prints_dir: Optional[str] = None
-    ) -> Dict[str, Any]:
-        """
-        Processa um único contrato e gera o documento.
-
-        Args:
-            excel_path: Caminho do arquivo Excel
-            template_path: Caminho do template Word
-            numero_contrato: Número do contrato a processar
-            output_dir: Diretório de saída (padrão: "output")
-            prints_dir: Pasta com imagens das cláusulas (opcional)
-
-        Returns:
-            Dicionário com:
-                - sucesso (bool): Se processou com sucesso
-                - contrato (str): Número do contrato
-                - arquivo (str): Caminho do arquivo gerado
-                - mensagem (str): Mensagem de status
-                - dados (dict): Informações do contrato
-        """
-        try:
-            processador = ProcessadorIniciais(
-                excel_path=excel_path,
-                template_path=template_path,
-                output_dir=output_dir,
-                prints_dir=prints_dir
-            )
-
-            resultado = processador.processar_contrato(numero_contrato)
-            return resultado
-
-        except Exception as e:
-            logger.error(f"Erro ao processar contrato {numero_contrato}: {e}")
-            return {
-                "sucesso": False,
-                "contrato": numero_contrato,
-                "arquivo": None,
-                "mensagem": f"Erro: {str(e)}",
-                "dados": {}
-            }
+def _pasta_cache_usuario() -> Path:
+    # Pasta de cache do próprio usuário (LOCALAPPDATA no Windows, XDG_CACHE_HOME ou
+    # ~/.cache nos demais), e não um caminho previsível no temporário compartilhado
+    base = os.environ.get('LOCALAPPDATA') if os.name == 'nt' else os.environ.get('XDG_CACHE_HOME')
+    return Path(base or Path.home() / '.cache') / "iniciais_contratos"
 
-    @staticmethod
-    def processar_lista_contratos(
-        excel_path: str,
-        template_path: str,
-        numeros_contratos: List[str],
-        output_dir: str = "output",
-        prints_dir: Optional[str] = None
-    ) -> Dict[str, Any]:
-        """
-        Processa uma lista específica de contratos.
-
-        Args:
-            excel_path: Caminho do arquivo Excel
-            template_path: Caminho do template Word
-            numeros_contratos: Lista de números de contratos
-            output_dir: Diretório de saída
-            prints_dir: Pasta com imagens das cláusulas (opcional)
-
-        Returns:
-            Dicionário com:
-                - sucesso (bool): Se todos processaram com sucesso
-                - total (int): Total de contratos processados
-                - sucessos (int): Quantidade de sucessos
-                - falhas (int): Quantidade de falhas
-                - resultados (list): Lista de resultados individuais
-        """
-        try:
-            processador = ProcessadorIniciais(
-                excel_path=excel_path,
-                template_path=template_path,
-                output_dir=output_dir,
-                prints_dir=prints_dir
-            )
 
-            resultados = processador.processar_lista(numeros_contratos)
+# Listas de contratos já extraídas, em disco, para valer também entre processos (ex.: CLI).
+# Cada versão de planilha gera um arquivo; a cada gravação os com mais de
+# CACHE_MAX_IDADE segundos saem e só os CACHE_MAX_ARQUIVOS mais recentes ficam
+CACHE_DIR = _pasta_cache_usuario()
+CACHE_MAX_ARQUIVOS = 64
+CACHE_MAX_IDADE = 30 * 24 * 3600.0
 
-            sucessos = sum(1 for r in resultados if r["sucesso"])
-            falhas = len(resultados) - sucessos
+# Resultados de verificar_pendencias reaproveitados enquanto planilha e pasta de prints
+# não mudam; a validade cobre o que o mtime da pasta não pega (ex.: um print trocado
+# por outro no mesmo segundo em sistemas de arquivos com mtime grosseiro)
+PENDENCIAS_TTL = 300.0
+PENDENCIAS_MAX = 32
+_pendencias_cache: Dict[tuple, Tuple[float, Dict[str, Any]]] = {}
+_pendencias_lock = threading.Lock()
 
-            return {
-                "sucesso": falhas == 0,
-                "total": len(resultados),
-                "sucessos": sucessos,
-                "falhas": falhas,
-                "resultados": resultados
-            }
 
-        except Exception as e:
-            logger.error(f"Erro ao processar lista de contratos: {e}")
-            return {
-                "sucesso": False,
-                "total": len(numeros_contratos),
-                "sucessos": 0,
-                "falhas": len(numeros_contratos),
-                "resultados": [],
-                "mensagem": f"Erro: {str(e)}"
-            }
+def _protegido(acao: str, falha: Callable[..., Dict[str, Any]]):
+    """
+    Decorador das funções públicas do serviço: uma exceção vira um log de erro
+    e o dicionário de falha da função, em vez de chegar à interface.
 
-    @staticmethod
-    def processar_todos_contratos(
-        excel_path: str,
-        template_path: str,
-        output_dir: str = "output",
-        prints_dir: Optional[str] = None,
-        max_workers: int = 4
-    ) -> Dict[str, Any]:
-        """
-        Processa todos os contratos de um arquivo Excel.
-
-        Args:
-            excel_path: Caminho do arquivo Excel
-            template_path: Caminho do template Word
-            output_dir: Diretório de saída
-            prints_dir: Pasta com imagens das cláusulas (opcional)
-            max_workers: Número de threads para processamento paralelo
-
-        Returns:
-            Dicionário com:
-                - sucesso (bool): Se todos processaram com sucesso
-                - total (int): Total de contratos
-                - sucessos (int): Quantidade de sucessos
-                - falhas (int): Quantidade de falhas
-                - resultados (list): Lista de resultados individuais
-        """
+    acao entra no log ("Erro ao {acao}: ...") e pode citar argumentos da
+    chamada pelo nome, ex.: "processar contrato {numero_contrato}". falha
+    recebe os argumentos da chamada (com os padrões) e erro="Erro: ...".
+    Os argumentos só são resolvidos quando há erro.
+    """
+    def decorador(funcao):
+        assinatura = inspect.signature(funcao)
+
+        @wraps(funcao)
+        def protegida(*args, **kwargs):
+            try:
+                return funcao(*args, **kwargs)
+            except Exception as e:
+                try:
+                    argumentos = assinatura.bind(*args, **kwargs)
+                except TypeError:
+                    # Argumentos que não casam com a função: o erro é da chamada em si
+                    raise e
+                argumentos.apply_defaults()
+                logger.error(f"Erro ao {acao.format(**argumentos.arguments)}: {e}")
+                return falha(**argumentos.arguments, erro=f"Erro: {str(e)}")
+
+        return protegida
+    return decorador
+
+
+def _falha_simples(erro: str, **_) -> Dict[str, Any]:
+    return {
+        "sucesso": False,
+        "mensagem": erro
+    }
+
+
+@lru_cache(maxsize=8)
+def _leitor(excel_path: str, versao: tuple) -> ExcelReader:
+    # Planilha lida uma vez e reaproveitada entre chamadas; versao = (mtime_ns, tamanho),
+    # então um arquivo alterado gera outra chave. O ExcelReader só é lido depois de
+    # carregado (cada obter_contrato monta um Contrato novo), então pode ser compartilhado
+    return ExcelReader(excel_path)
+
+
+def _planilha(excel_path: str) -> Tuple[str, tuple]:
+    # (caminho absoluto, (mtime_ns, tamanho)): a chave dos caches, com um stat só.
+    # Planilha ausente vira uma mensagem clara logo na entrada, não um erro do leitor
+    try:
+        st = os.stat(excel_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Arquivo não encontrado: {excel_path}") from None
+    if not stat.S_ISREG(st.st_mode):
+        raise FileNotFoundError(f"Arquivo não encontrado: {excel_path}")
+    return os.path.abspath(excel_path), (st.st_mtime_ns, st.st_size)
+
+
+def _obter_leitor(excel_path: str) -> ExcelReader:
+    return _leitor(*_planilha(excel_path))
+
+
+def _pasta_cache() -> Optional[Path]:
+    # CACHE_DIR criada só para o usuário (0700). O JSON lido dali decide o que
+    # listar_contratos devolve, então a pasta só é usada se for um diretório de
+    # verdade, do próprio usuário e sem escrita para outros; senão, sem cache
+    try:
+        CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        st = os.lstat(CACHE_DIR)
+    except OSError as e:
+        logger.debug(f"Cache de contratos indisponível: {e}")
+        return None
+    if not stat.S_ISDIR(st.st_mode) or (
+        hasattr(os, 'getuid') and (st.st_uid != os.getuid() or st.st_mode & 0o022)
+    ):
+        logger.warning(f"Cache de contratos ignorado: {CACHE_DIR} não é uma pasta segura")
+        return None
+    return CACHE_DIR
+
+
+def _lista_valida(contratos: Any) -> bool:
+    # Mesmo formato de listar_contratos: uma lista de números como str (e NaN, que o
+    # pandas mantém nas linhas sem número)
+    return isinstance(contratos, list) and all(
+        isinstance(c, str) or (isinstance(c, float) and c != c) for c in contratos
+    )
+
+
+def _podar_cache(pasta: Path) -> None:
+    # Listas de planilhas alteradas ou reenviadas nunca mais são lidas (o nome muda
+    # com a versão); sem a poda, elas se acumulariam na pasta do usuário
+    arquivos = []
+    with os.scandir(pasta) as it:
+        for entry in it:
+            if entry.name.endswith('.json'):
+                try:
+                    arquivos.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass
+    arquivos.sort(reverse=True)
+    limite = time.time() - CACHE_MAX_IDADE
+    for i, (mtime, caminho) in enumerate(arquivos):
+        if i >= CACHE_MAX_ARQUIVOS or mtime < limite:
+            try:
+                os.unlink(caminho)
+            except OSError:
+                pass
+
+
+def _listar_numeros(excel_path: str) -> List[str]:
+    # Chave = caminho + (mtime_ns, tamanho), como no cache em memória; um arquivo
+    # alterado gera outro nome e a lista antiga só deixa de ser usada
+    caminho, versao = _planilha(excel_path)
+    pasta = _pasta_cache()
+    if pasta is None:
+        return _leitor(caminho, versao).listar_contratos()
+
+    chave = f"{caminho}:{versao[0]}:{versao[1]}"
+    cache_path = pasta / f"{hashlib.sha1(chave.encode()).hexdigest()}.json"
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            contratos = json.load(f)
+        if _lista_valida(contratos):
+            return contratos
+        logger.debug(f"Cache de contratos com formato inesperado: {cache_path}")
+    except (OSError, ValueError):
+        pass
+
+    contratos = _leitor(caminho, versao).listar_contratos()
+
+    # O cache é só um atalho: se não der para gravar, a lista segue normalmente.
+    # Gravado à parte e renomeado, para que um leitor nunca veja o arquivo pela metade
+    parcial = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.part")
+    try:
+        with open(parcial, 'w', encoding='utf-8') as f:
+            json.dump(contratos, f, ensure_ascii=False)
+        os.replace(parcial, cache_path)
+    except OSError as e:
+        logger.debug(f"Cache de contratos não gravado: {e}")
         try:
-            processador = ProcessadorIniciais(
-                excel_path=excel_path,
-                template_path=template_path,
-                output_dir=output_dir,
-                prints_dir=prints_dir
-            )
+            os.unlink(parcial)
+        except OSError:
+            pass
+        return contratos
+
+    try:
+        _podar_cache(pasta)
+    except OSError as e:
+        logger.debug(f"Cache de contratos não podado: {e}")
+    return contratos
+
+
+def _consolidar(resultados: Iterator[Dict[str, Any]], arquivo_resultados: Optional[str]) -> Dict[str, Any]:
+    # Uma passada só sobre os resultados; com arquivo_resultados cada um vai para uma
+    # linha JSON (JSONL) assim que fica pronto e a lista não é mantida em memória
+    total = sucessos = 0
+    lista: List[Dict[str, Any]] = []
+    arquivo = open(arquivo_resultados, 'w', encoding='utf-8') if arquivo_resultados else None
+    try:
+        for r in resultados:
+            total += 1
+            sucessos += r["sucesso"]
+            if arquivo is None:
+                lista.append(r)
+            else:
+                arquivo.write(json.dumps(r, ensure_ascii=False) + "\n")
+    finally:
+        if arquivo is not None:
+            arquivo.close()
+
+    falhas = total - sucessos
+    consolidado = {
+        "sucesso": falhas == 0,
+        "total": total,
+        "sucessos": sucessos,
+        "falhas": falhas,
+        "resultados": lista
+    }
+    if arquivo_resultados:
+        consolidado["arquivo_resultados"] = arquivo_resultados
+    return consolidado
+
+
+@_protegido("processar contrato {numero_contrato}", lambda numero_contrato, erro, **_: {
+    "sucesso": False,
+    "contrato": numero_contrato,
+    "arquivo": None,
+    "mensagem": erro,
+    "dados": {}
+})
+def processar_contrato_unico(
+    excel_path: str,
+    template_path: str,
+    numero_contrato: str,
+    output_dir: str = "output",
+    prints_dir: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Processa um único contrato e gera o documento.
+
+    Args:
+        excel_path: Caminho do arquivo Excel
+        template_path: Caminho do template Word
+        numero_contrato: Número do contrato a processar
+        output_dir: Diretório de saída (padrão: "output")
+        prints_dir: Pasta com imagens das cláusulas (opcional)
+
+    Returns:
+        Dicionário com:
+            - sucesso (bool): Se processou com sucesso
+            - contrato (str): Número do contrato
+            - arquivo (str): Caminho do arquivo gerado
+            - mensagem (str): Mensagem de status
+            - dados (dict): Informações do contrato
+    """
+    processador = ProcessadorIniciais(
+        excel_path=excel_path,
+        template_path=template_path,
+        output_dir=output_dir,
+        prints_dir=prints_dir,
+        reader=_obter_leitor(excel_path)
+    )
+
+    resultado = processador.processar_contrato(numero_contrato)
+    return resultado
+
+
+@_protegido("processar lista de contratos", lambda numeros_contratos, erro, **_: {
+    "sucesso": False,
+    "total": len(numeros_contratos),
+    "sucessos": 0,
+    "falhas": len(numeros_contratos),
+    "resultados": [],
+    "mensagem": erro
+})
+def processar_lista_contratos(
+    excel_path: str,
+    template_path: str,
+    numeros_contratos: List[str],
+    output_dir: str = "output",
+    prints_dir: Optional[str] = None,
+    arquivo_resultados: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Processa uma lista específica de contratos.
+
+    Args:
+        excel_path: Caminho do arquivo Excel
+        template_path: Caminho do template Word
+        numeros_contratos: Lista de números de contratos
+        output_dir: Diretório de saída
+        prints_dir: Pasta com imagens das cláusulas (opcional)
+        arquivo_resultados: Grava os resultados neste arquivo, um JSON por linha,
+            em vez de devolvê-los em 'resultados' (opcional; para listas grandes)
+
+    Returns:
+        Dicionário com:
+            - sucesso (bool): Se todos processaram com sucesso
+            - total (int): Total de contratos processados
+            - sucessos (int): Quantidade de sucessos
+            - falhas (int): Quantidade de falhas
+            - resultados (list): Lista de resultados individuais (vazia com arquivo_resultados)
+            - arquivo_resultados (str): Arquivo JSONL gravado (só com arquivo_resultados)
+    """
+    processador = ProcessadorIniciais(
+        excel_path=excel_path,
+        template_path=template_path,
+        output_dir=output_dir,
+        prints_dir=prints_dir,
+        reader=_obter_leitor(excel_path)
+    )
+
+    return _consolidar(processador.iter_lista(numeros_contratos), arquivo_resultados)
+
+
+@_protegido("processar todos os contratos", lambda erro, **_: {
+    "sucesso": False,
+    "total": 0,
+    "sucessos": 0,
+    "falhas": 0,
+    "resultados": [],
+    "mensagem": erro
+})
+def processar_todos_contratos(
+    excel_path: str,
+    template_path: str,
+    output_dir: str = "output",
+    prints_dir: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    arquivo_resultados: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Processa todos os contratos de um arquivo Excel.
+
+    Args:
+        excel_path: Caminho do arquivo Excel
+        template_path: Caminho do template Word
+        output_dir: Diretório de saída
+        prints_dir: Pasta com imagens das cláusulas (opcional)
+        max_workers: Número de processos que geram os documentos (None = número de CPUs)
+        arquivo_resultados: Grava os resultados neste arquivo, um JSON por linha,
+            em vez de devolvê-los em 'resultados' (opcional; para planilhas grandes)
+
+    Returns:
+        Dicionário com:
+            - sucesso (bool): Se todos processaram com sucesso
+            - total (int): Total de contratos
+            - sucessos (int): Quantidade de sucessos
+            - falhas (int): Quantidade de falhas
+            - resultados (list): Lista de resultados individuais (vazia com arquivo_resultados)
+            - arquivo_resultados (str): Arquivo JSONL gravado (só com arquivo_resultados)
+    """
+    processador = ProcessadorIniciais(
+        excel_path=excel_path,
+        template_path=template_path,
+        output_dir=output_dir,
+        prints_dir=prints_dir,
+        reader=_obter_leitor(excel_path)
+    )
+
+    return _consolidar(processador.iter_todos(max_workers), arquivo_resultados)
+
+
+@_protegido("processar lote", lambda erro, **_: {
+    "sucesso": False,
+    "arquivos_processados": 0,
+    "contratos_total": 0,
+    "contratos_completos": 0,
+    "contratos_pendentes": 0,
+    "documentos_gerados": 0,
+    "mensagem": erro
+})
+def processar_lote(
+    excel_dir: str,
+    template_path: str,
+    output_dir: str = "output",
+    prints_dir: Optional[str] = None,
+    pendencias_dir: str = "pendencias",
+    gerar_documentos: bool = True,
+    max_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Processa todos os arquivos Excel de uma pasta (modo lote).
+
+    Args:
+        excel_dir: Pasta com arquivos Excel
+        template_path: Caminho do template Word
+        output_dir: Diretório de saída
+        prints_dir: Pasta com imagens das cláusulas (opcional)
+        pendencias_dir: Diretório para relatórios de pendências
+        gerar_documentos: Se False, só gera o relatório de pendências (bem mais rápido)
+        max_workers: Número de processos (None = número de CPUs; 1 = no processo atual)
+
+    Returns:
+        Dicionário com estatísticas:
+            - sucesso (bool): Se processou sem erros críticos
+            - arquivos_processados (int): Quantidade de arquivos Excel processados
+            - contratos_total (int): Total de contratos encontrados
+            - contratos_completos (int): Contratos sem pendências
+            - contratos_pendentes (int): Contratos com pendências
+            - documentos_gerados (int): Total de documentos gerados
+    """
+    processador = ProcessadorLote(
+        excel_dir=excel_dir,
+        template_path=template_path,
+        output_dir=output_dir,
+        prints_dir=prints_dir,
+        pendencias_dir=pendencias_dir,
+        gerar_documentos=gerar_documentos
+    )
+
+    stats = processador.processar_todos(max_workers=max_workers)
+    stats["sucesso"] = True
+
+    return stats
+
+
+@_protegido("listar contratos", lambda erro, **_: {
+    "sucesso": False,
+    "total": 0,
+    "contratos": [],
+    "mensagem": erro
+})
+def listar_contratos(excel_path: str) -> Dict[str, Any]:
+    """
+    Lista todos os contratos disponíveis em um arquivo Excel.
+
+    Args:
+        excel_path: Caminho do arquivo Excel
 
-            resultados = processador.processar_todos(max_workers=max_workers)
+    Returns:
+        Dicionário com:
+            - sucesso (bool): Se conseguiu listar
+            - total (int): Quantidade de contratos
+            - contratos (list): Lista de números de contratos
+    """
+    contratos = _listar_numeros(excel_path)
 
-            sucessos = sum(1 for r in resultados if r["sucesso"])
-            falhas = len(resultados) - sucessos
+    return {
+        "sucesso": True,
+        "total": len(contratos),
+        "contratos": contratos
+    }
 
-            return {
-                "sucesso": falhas == 0,
-                "total": len(resultados),
-                "sucessos": sucessos,
-                "falhas": falhas,
-                "resultados": resultados
-            }
 
-        except Exception as e:
-            logger.error(f"Erro ao processar todos os contratos: {e}")
-            return {
-                "sucesso": False,
-                "total": 0,
-                "sucessos": 0,
-                "falhas": 0,
-                "resultados": [],
-                "mensagem": f"Erro: {str(e)}"
-            }
+def limpar_cache() -> None:
+    """
+    Descarta as planilhas e os resultados de verificar_pendencias mantidos em
+    memória entre chamadas e as listas de contratos gravadas em CACHE_DIR.
 
-    @staticmethod
-    def processar_lote(
-        excel_dir: str,
-        template_path: str,
-        output_dir: str = "output",
-        prints_dir: Optional[str] = None,
-        pendencias_dir: str = "pendencias"
-    ) -> Dict[str, Any]:
-        """
-        Processa todos os arquivos Excel de uma pasta (modo lote).
-
-        Args:
-            excel_dir: Pasta com arquivos Excel
-            template_path: Caminho do template Word
-            output_dir: Diretório de saída
-            prints_dir: Pasta com imagens das cláusulas (opcional)
-            pendencias_dir: Diretório para relatórios de pendências
-
-        Returns:
-            Dicionário com estatísticas:
-                - sucesso (bool): Se processou sem erros críticos
-                - arquivos_processados (int): Quantidade de arquivos Excel processados
-                - contratos_total (int): Total de contratos encontrados
-                - contratos_completos (int): Contratos sem pendências
-                - contratos_pendentes (int): Contratos com pendências
-                - documentos_gerados (int): Total de documentos gerados
-        """
+    Não é preciso para ver alterações num arquivo (elas já geram uma nova
+    leitura); serve para liberar a memória e o disco.
+    """
+    _leitor.cache_clear()
+    with _pendencias_lock:
+        _pendencias_cache.clear()
+    for cache_path in CACHE_DIR.glob("*.json"):
         try:
-            processador = ProcessadorLote(
-                excel_dir=excel_dir,
-                template_path=template_path,
-                output_dir=output_dir,
-                prints_dir=prints_dir,
-                pendencias_dir=pendencias_dir
-            )
+            cache_path.unlink()
+        except OSError:
+            pass
 
-            stats = processador.processar_todos()
-            stats["sucesso"] = True
 
-            return stats
-
-        except Exception as e:
-            logger.error(f"Erro ao processar lote: {e}")
-            return {
-                "sucesso": False,
-                "arquivos_processados": 0,
-                "contratos_total": 0,
-                "contratos_completos": 0,
-                "contratos_pendentes": 0,
-                "documentos_gerados": 0,
-                "mensagem": f"Erro: {str(e)}"
-            }
+@_protegido("obter configuração", lambda **_: {})
+def obter_configuracao() -> Dict[str, Any]:
+    """
+    Obtém a configuração atual do sistema.
 
-    @staticmethod
-    def listar_contratos(excel_path: str) -> Dict[str, Any]:
-        """
-        Lista todos os contratos disponíveis em um arquivo Excel.
+    Returns:
+        Dicionário com configurações
+    """
+    return get_config()
 
-        Args:
-            excel_path: Caminho do arquivo Excel
 
-        Returns:
-            Dicionário com:
-                - sucesso (bool): Se conseguiu listar
-                - total (int): Quantidade de contratos
-                - contratos (list): Lista de números de contratos
-        """
-        try:
-            from .excel_reader import ExcelReader
+@_protegido("salvar configuração", _falha_simples)
+def salvar_configuracao(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Salva configuração do sistema.
 
-            reader = ExcelReader(excel_path)
-            contratos = reader.listar_contratos()
+    Args:
+        config: Dicionário com configurações
 
-            return {
-                "sucesso": True,
-                "total": len(contratos),
-                "contratos": contratos
-            }
+    Returns:
+        Dicionário com:
+            - sucesso (bool): Se salvou com sucesso
+            - mensagem (str): Mensagem de status
+    """
+    sucesso = save_config(config)
+    return {
+        "sucesso": sucesso,
+        "mensagem": "Configuração salva com sucesso" if sucesso else "Erro ao salvar configuração"
+    }
 
-        except Exception as e:
-            logger.error(f"Erro ao listar contratos: {e}")
-            return {
-                "sucesso": False,
-                "total": 0,
-                "contratos": [],
-                "mensagem": f"Erro: {str(e)}"
-            }
 
-    @staticmethod
-    def obter_configuracao() -> Dict[str, Any]:
-        """
-        Obtém a configuração atual do sistema.
+@_protegido("atualizar configuração", _falha_simples)
+def atualizar_configuracao(updates: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Atualiza campos específicos da configuração.
 
-        Returns:
-            Dicionário com configurações
-        """
-        try:
-            return get_config()
-        except Exception as e:
-            logger.error(f"Erro ao obter configuração: {e}")
-            return {}
-
-    @staticmethod
-    def salvar_configuracao(config: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Salva configuração do sistema.
-
-        Args:
-            config: Dicionário com configurações
-
-        Returns:
-            Dicionário com:
-                - sucesso (bool): Se salvou com sucesso
-                - mensagem (str): Mensagem de status
-        """
-        try:
-            sucesso = save_config(config)
-            return {
-                "sucesso": sucesso,
-                "mensagem": "Configuração salva com sucesso" if sucesso else "Erro ao salvar configuração"
-            }
-        except Exception as e:
-            logger.error(f"Erro ao salvar configuração: {e}")
-            return {
-                "sucesso": False,
-                "mensagem": f"Erro: {str(e)}"
-            }
+    Args:
+        updates: Dicionário com campos a atualizar
 
-    @staticmethod
-    def atualizar_configuracao(updates: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Atualiza campos específicos da configuração.
+    Returns:
+        Dicionário com:
+            - sucesso (bool): Se atualizou com sucesso
+            - mensagem (str): Mensagem de status
+    """
+    sucesso = update_config(updates)
+    return {
+        "sucesso": sucesso,
+        "mensagem": "Configuração atualizada com sucesso" if sucesso else "Erro ao atualizar configuração"
+    }
 
-        Args:
-            updates: Dicionário com campos a atualizar
 
-        Returns:
-            Dicionário com:
-                - sucesso (bool): Se atualizou com sucesso
-                - mensagem (str): Mensagem de status
-        """
+def verificar_pendencias(
+    excel_path: str,
+    prints_dir: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Verifica pendências em contratos sem gerar documentos.
+
+    Enquanto a planilha e a pasta de prints não mudam, o resultado é
+    reaproveitado por até PENDENCIAS_TTL segundos.
+
+    Args:
+        excel_path: Caminho do arquivo Excel
+        prints_dir: Pasta com imagens das cláusulas (opcional)
+
+    Returns:
+        Dicionário com:
+            - sucesso (bool): Se conseguiu verificar
+            - total_contratos (int): Total de contratos verificados
+            - contratos_completos (int): Contratos sem pendências
+            - contratos_pendentes (int): Contratos com pendências
+            - pendencias (list): Lista de pendências encontradas
+    """
+    chave = _chave_pendencias(excel_path, prints_dir)
+    agora = time.monotonic()
+    if chave is not None:
+        with _pendencias_lock:
+            item = _pendencias_cache.get(chave)
+        if item is not None and agora - item[0] <= PENDENCIAS_TTL:
+            return _copiar_pendencias(item[1])
+
+    resultado = _verificar_pendencias(excel_path, prints_dir)
+
+    # Só resultados de sucesso são guardados; os erros são refeitos na próxima chamada
+    if chave is not None and resultado["sucesso"]:
+        with _pendencias_lock:
+            for k in [k for k, (quando, _) in _pendencias_cache.items() if agora - quando > PENDENCIAS_TTL]:
+                del _pendencias_cache[k]
+            _pendencias_cache[chave] = (agora, resultado)
+            while len(_pendencias_cache) > PENDENCIAS_MAX:
+                del _pendencias_cache[next(iter(_pendencias_cache))]
+        return _copiar_pendencias(resultado)
+    return resultado
+
+
+def _chave_pendencias(excel_path: str, prints_dir: Optional[str]) -> Optional[tuple]:
+    # Planilha e pasta de prints por (caminho, mtime_ns[, tamanho]); criar ou remover
+    # um print altera o mtime da pasta. None se a planilha não puder ser lida
+    try:
+        caminho, versao = _planilha(excel_path)
+    except OSError:
+        return None
+    prints = None
+    if prints_dir:
         try:
-            sucesso = update_config(updates)
-            return {
-                "sucesso": sucesso,
-                "mensagem": "Configuração atualizada com sucesso" if sucesso else "Erro ao atualizar configuração"
-            }
-        except Exception as e:
-            logger.error(f"Erro ao atualizar configuração: {e}")
+            prints = (os.path.abspath(prints_dir), os.stat(prints_dir).st_mtime_ns)
+        except OSError:
+            # Pasta inexistente: nenhuma imagem é verificada
+            prints = (os.path.abspath(prints_dir), None)
+    return caminho, versao, prints
+
+
+def _copiar_pendencias(resultado: Dict[str, Any]) -> Dict[str, Any]:
+    # Cada chamador recebe sua cópia; alterá-la não afeta o resultado guardado
+    return {**resultado, "pendencias": [dict(p) for p in resultado["pendencias"]]}
+
+
+@_protegido("verificar pendências", lambda erro, **_: {
+    "sucesso": False,
+    "total_contratos": 0,
+    "contratos_completos": 0,
+    "contratos_pendentes": 0,
+    "pendencias": [],
+    "mensagem": erro
+})
+def _verificar_pendencias(excel_path: str, prints_dir: Optional[str]) -> Dict[str, Any]:
+    _planilha(excel_path)
+    verificador = VerificadorPendencias(prints_dir)
+
+    todas_pendencias = []
+    contratos_pendentes = 0
+    total_contratos = 0
+
+    # Linhas lidas em streaming, uma por vez, só com as colunas verificadas
+    # (a mesma leitura do processamento em lote)
+    usadas = set(verificador.CAMPOS_OBRIGATORIOS) | {'contrato'}
+    with _abrir_planilha(Path(excel_path), usadas, com_enderecos=False) as planilha:
+        if planilha is None:
             return {
                 "sucesso": False,
-                "mensagem": f"Erro: {str(e)}"
+                "mensagem": "Planilha sem aba de contatos válida"
             }
 
-    @staticmethod
-    def verificar_pendencias(
-        excel_path: str,
-        prints_dir: Optional[str] = None
-    ) -> Dict[str, Any]:
-        """
-        Verifica pendências em contratos sem gerar documentos.
-
-        Args:
-            excel_path: Caminho do arquivo Excel
-            prints_dir: Pasta com imagens das cláusulas (opcional)
-
-        Returns:
-            Dicionário com:
-                - sucesso (bool): Se conseguiu verificar
-                - total_contratos (int): Total de contratos verificados
-                - contratos_completos (int): Contratos sem pendências
-                - contratos_pendentes (int): Contratos com pendências
-                - pendencias (list): Lista de pendências encontradas
-        """
-        try:
-            import pandas as pd
-            from .validators import VerificadorPendencias
-
-            verificador = VerificadorPendencias(prints_dir)
-
-            # Carrega planilha
-            xlsx = pd.ExcelFile(excel_path)
-            df_contatos = None
+        linhas, _ = planilha
+        for row in linhas:
+            total_contratos += 1
+            numero = row.get('contrato')
+            if numero is None or numero != numero or numero in ('', 'nan'):
+                continue
+            numero = str(numero)
 
-            for sheet in xlsx.sheet_names:
-                if 'contato' in sheet.lower() or 'base' in sheet.lower():
-                    df_contatos = pd.read_excel(xlsx, sheet_name=sheet, dtype=str)
-                    df_contatos.columns = [str(c).strip().lower() for c in df_contatos.columns]
-                    break
+            pendencias = verificador.verificar_contrato(row, numero)
+            if pendencias:
+                contratos_pendentes += 1
+                todas_pendencias.extend(pendencias)
 
-            if df_contatos is None or 'contrato' not in df_contatos.columns:
-                return {
-                    "sucesso": False,
-                    "mensagem": "Planilha sem aba de contatos válida"
-                }
+    contratos_completos = total_contratos - contratos_pendentes
 
-            todas_pendencias = []
-            contratos_pendentes = 0
+    return {
+        "sucesso": True,
+        "total_contratos": total_contratos,
+        "contratos_completos": contratos_completos,
+        "contratos_pendentes": contratos_pendentes,
+        "pendencias": todas_pendencias
+    }
 
-            for _, row in df_contatos.iterrows():
-                numero = str(row.get('contrato', ''))
-                if not numero or numero == 'nan':
-                    continue
 
-                pendencias = verificador.verificar_contrato(row, numero)
-                if pendencias:
-                    contratos_pendentes += 1
-                    todas_pendencias.extend(pendencias)
-
-            total_contratos = len(df_contatos)
-            contratos_completos = total_contratos - contratos_pendentes
+class ProcessingService:
+    """
+    Serviço principal para processamento de iniciais arbitrais.
 
-            return {
-                "sucesso": True,
-                "total_contratos": total_contratos,
-                "contratos_completos": contratos_completos,
-                "contratos_pendentes": contratos_pendentes,
-                "pendencias": todas_pendencias
-            }
+    Esta classe fornece uma interface de alto nível, independente de implementação,
+    facilitando a integração com diferentes tipos de interface (GUI, CLI, API REST).
+    Reúne as funções deste módulo, que também podem ser importadas diretamente.
+    """
 
-        except Exception as e:
-            logger.error(f"Erro ao verificar pendências: {e}")
-            return {
-                "sucesso": False,
-                "total_contratos": 0,
-                "contratos_completos": 0,
-                "contratos_pendentes": 0,
-                "pendencias": [],
-                "mensagem": f"Erro: {str(e)}"
-            }
+    processar_contrato_unico = staticmethod(processar_contrato_unico)
+    processar_lista_contratos = staticmethod(processar_lista_contratos)
+    processar_todos_contratos = staticmethod(processar_todos_contratos)
+    processar_lote = staticmethod(processar_lote)
+    listar_contratos = staticmethod(listar_contratos)
+    limpar_cache = staticmethod(limpar_cache)
+    obter_configuracao = staticmethod(obter_configuracao)
+    salvar_configuracao = staticmethod(salvar_configuracao)
+    atualizar_configuracao = staticmethod(atualizar_configuracao)
+    verificar_pendencias = staticmethod(verificar_pendencias)
@@ -6,11 +6,30 @@ Gerador de Iniciais Arbitrais
 Funções utilitárias para formatação de dados.
 """
 
+import os
 import re
-from datetime import date
-from typing import Any, List
-
-
+import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any, List, Pattern, Tuple, Union
+
+# Extensões procuradas para as imagens das cláusulas (prints). Em sistemas de
+# arquivos que não diferenciam maiúsculas/minúsculas (Windows) as variantes em
+# maiúsculas são redundantes e só custariam chamadas extras ao sistema.
+SISTEMA_ARQUIVOS_CASE_INSENSITIVE = os.path.normcase('A') == 'a'
+EXTENSOES_IMAGEM = ('.png', '.jpg', '.jpeg')
+if not SISTEMA_ARQUIVOS_CASE_INSENSITIVE:
+    EXTENSOES_IMAGEM += tuple(ext.upper() for ext in EXTENSOES_IMAGEM)
+
+# Padrões compilados uma vez só: estas funções rodam para cada campo de cada contrato
+_NAO_DIGITOS = re.compile(r'\D')
+SEPARADORES_PADRAO = r'[,;|]'
+_SEPARADORES = re.compile(SEPARADORES_PADRAO)
+
+
+# CPFs e telefones se repetem entre contratos (a mesma pessoa em vários); typed=True
+# porque a entrada inválida é devolvida como veio e 1 == 1.0 dariam a mesma chave
+@lru_cache(maxsize=8192, typed=True)
 def formatar_cpf(cpf: str) -> str:
     """
     Formata CPF para XXX.XXX.XXX-XX
@@ -23,12 +42,13 @@ def formatar_cpf(cpf: str) -> str:
     """
     if not cpf:
         return ""
-    numeros = re.sub(r'\D', '', str(cpf))
+    numeros = _NAO_DIGITOS.sub('', str(cpf))
     if len(numeros) == 11:
         return f"{numeros[:3]}.{numeros[3:6]}.{numeros[6:9]}-{numeros[9:]}"
     return cpf
 
 
+@lru_cache(maxsize=8192, typed=True)
 def formatar_telefone(telefone: str) -> str:
     """
     Formata telefone para (XX) XXXXX-XXXX
@@ -42,7 +62,7 @@ def formatar_telefone(telefone: str) -> str:
     if not telefone:
         return ""
     # Remove tudo que não é número (incluindo decimal)
-    numeros = re.sub(r'\D', '', str(telefone).split('.')[0])
+    numeros = _NAO_DIGITOS.sub('', str(telefone).partition('.')[0])
     # Remove código do país
     if numeros.startswith('55') and len(numeros) > 11:
         numeros = numeros[2:]
@@ -66,9 +86,40 @@ def formatar_valor(valor: float) -> str:
     Returns:
         Valor formatado em reais
     """
-    return f"R${valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    # Milhar agrupado com '_' (que não aparece no número): duas trocas em vez de três
+    return f"R${valor:_.2f}".replace(".", ",").replace("_", ".")
+
+
+_UNIDADES = ('', 'um', 'dois', 'três', 'quatro', 'cinco', 'seis', 'sete', 'oito', 'nove')
+_ESPECIAIS = ('dez', 'onze', 'doze', 'treze', 'quatorze', 'quinze', 'dezesseis', 'dezessete', 'dezoito', 'dezenove')
+_DEZENAS = ('', '', 'vinte', 'trinta', 'quarenta', 'cinquenta', 'sessenta', 'setenta', 'oitenta', 'noventa')
+_CENTENAS = ('', 'cento', 'duzentos', 'trezentos', 'quatrocentos', 'quinhentos', 'seiscentos', 'setecentos', 'oitocentos', 'novecentos')
 
 
+def _extenso_ate_999(n: int) -> str:
+    if n == 0:
+        return ''
+    if n == 100:
+        return 'cem'
+
+    resultado = []
+    if n >= 100:
+        resultado.append(_CENTENAS[n // 100])
+        n = n % 100
+    if n >= 20:
+        resultado.append(_DEZENAS[n // 10])
+        if n % 10 > 0:
+            resultado.append(_UNIDADES[n % 10])
+    elif n >= 10:
+        resultado.append(_ESPECIAIS[n - 10])
+    elif n > 0:
+        resultado.append(_UNIDADES[n])
+
+    return ' e '.join([r for r in resultado if r])
+
+
+# Os mesmos valores (aluguéis, encargos) se repetem muito entre contratos
+@lru_cache(maxsize=4096)
 def valor_por_extenso(valor: float) -> str:
     """
     Converte valor para extenso em português
@@ -82,32 +133,6 @@ def valor_por_extenso(valor: float) -> str:
     if valor == 0:
         return "zero reais"
 
-    unidades = ['', 'um', 'dois', 'três', 'quatro', 'cinco', 'seis', 'sete', 'oito', 'nove']
-    especiais = ['dez', 'onze', 'doze', 'treze', 'quatorze', 'quinze', 'dezesseis', 'dezessete', 'dezoito', 'dezenove']
-    dezenas = ['', '', 'vinte', 'trinta', 'quarenta', 'cinquenta', 'sessenta', 'setenta', 'oitenta', 'noventa']
-    centenas = ['', 'cento', 'duzentos', 'trezentos', 'quatrocentos', 'quinhentos', 'seiscentos', 'setecentos', 'oitocentos', 'novecentos']
-
-    def _extenso_ate_999(n):
-        if n == 0:
-            return ''
-        if n == 100:
-            return 'cem'
-
-        resultado = []
-        if n >= 100:
-            resultado.append(centenas[n // 100])
-            n = n % 100
-        if n >= 20:
-            resultado.append(dezenas[n // 10])
-            if n % 10 > 0:
-                resultado.append(unidades[n % 10])
-        elif n >= 10:
-            resultado.append(especiais[n - 10])
-        elif n > 0:
-            resultado.append(unidades[n])
-
-        return ' e '.join([r for r in resultado if r])
-
     valor = round(valor, 2)
     inteiro = int(valor)
     centavos = int(round((valor - inteiro) * 100))
@@ -160,10 +185,38 @@ def formatar_data(dt: date = None) -> str:
         Data formatada
     """
     if dt is None:
-        dt = date.today()
-    meses = ['', 'janeiro', 'fevereiro', 'março', 'abril', 'maio', 'junho',
-             'julho', 'agosto', 'setembro', 'outubro', 'novembro', 'dezembro']
-    return f"{dt.day} de {meses[dt.month]} de {dt.year}"
+        return _data_de_hoje()
+    return _data_por_extenso(dt)
+
+
+# Texto da data de hoje e o intervalo [meia-noite, próxima meia-noite) locais, em
+# time.time(), em que ele vale: comparar o relógio custa bem menos que date.today()
+_hoje: Tuple[float, float, str] = (0.0, 0.0, "")
+
+
+def _data_de_hoje() -> str:
+    global _hoje
+    agora = time.time()
+    inicio, fim, texto = _hoje
+    # Os dois limites: um relógio atrasado também invalida o texto
+    if inicio <= agora < fim:
+        return texto
+
+    hoje = date.today()
+    inicio = datetime.combine(hoje, datetime.min.time()).timestamp()
+    fim = datetime.combine(hoje + timedelta(days=1), datetime.min.time()).timestamp()
+    texto = _data_por_extenso(hoje)
+    _hoje = (inicio, fim, texto)
+    return texto
+
+
+_MESES = ('', 'janeiro', 'fevereiro', 'março', 'abril', 'maio', 'junho',
+          'julho', 'agosto', 'setembro', 'outubro', 'novembro', 'dezembro')
+
+
+@lru_cache(maxsize=64)
+def _data_por_extenso(dt: date) -> str:
+    return f"{dt.day} de {_MESES[dt.month]} de {dt.year}"
 
 
 def limpar_texto(texto: Any) -> str:
@@ -176,24 +229,25 @@ def limpar_texto(texto: Any) -> str:
     Returns:
         Texto limpo
     """
-    import pandas as pd
-    if pd.isna(texto) or texto is None:
+    # Vazio vem como None (leitura em streaming) ou NaN (pandas); NaN é o único
+    # float diferente de si mesmo, sem precisar do pd.isna
+    if texto is None or (isinstance(texto, float) and texto != texto):
         return ""
     return str(texto).strip()
 
 
-def separar_valores(texto: str, separadores: str = r'[,;|]') -> List[str]:
+def separar_valores(texto: str, separadores: Union[str, Pattern] = SEPARADORES_PADRAO) -> List[str]:
     """
     Separa múltiplos valores em uma string
 
     Args:
         texto: Texto com múltiplos valores
-        separadores: Padrão regex de separadores
+        separadores: Padrão regex de separadores (texto ou já compilado)
 
     Returns:
         Lista de valores separados
     """
     if not texto:
         return []
-    partes = re.split(separadores, texto)
-    return [p.strip() for p in partes if p.strip()]
+    padrao = _SEPARADORES if separadores == SEPARADORES_PADRAO else re.compile(separadores)
+    return [p for p in map(str.strip, padrao.split(texto)) if p]
@@ -6,10 +6,18 @@ Gerador de Iniciais Arbitrais
 Classes responsáveis por validar dados e verificar pendências.
 """
 
+import os
+import time
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Mapping, Optional, Set
 
-import pandas as pd
+from .utils import EXTENSOES_IMAGEM, SISTEMA_ARQUIVOS_CASE_INSENSITIVE
+
+# Validade (segundos) do índice de imagens da pasta de prints
+INDICE_PRINTS_TTL = 30.0
+
+# Extensões de EXTENSOES_IMAGEM em conjunto: uma busca por entrada da pasta
+_EXTENSOES = frozenset(EXTENSOES_IMAGEM)
 
 
 class VerificadorPendencias:
@@ -27,6 +35,12 @@ class VerificadorPendencias:
         'valor_atualizado': 'Valor Atualizado do Débito',
     }
 
+    # (campo, descrição, observação) montados uma vez, fora do laço por contrato
+    _CAMPOS = tuple(
+        (campo, descricao, f'{descricao} não preenchido')
+        for campo, descricao in CAMPOS_OBRIGATORIOS.items()
+    )
+
     def __init__(self, prints_dir: str = None):
         """
         Inicializa o verificador
@@ -35,13 +49,48 @@ class VerificadorPendencias:
             prints_dir: Pasta com imagens das cláusulas (opcional)
         """
         self.prints_dir = Path(prints_dir) if prints_dir else None
+        self._prints_prefixo = str(self.prints_dir) if self.prints_dir else ''
+        self._indice_imagens: Optional[Set[str]] = None
+        self._indice_em = 0.0
+
+    def _contratos_com_imagem(self) -> Optional[Set[str]]:
+        """
+        Números de contrato com imagem na pasta de prints (None se a pasta não existe).
+
+        Uma listagem da pasta (os.scandir) substitui os stat de cada extensão
+        em cada contrato; é refeita após INDICE_PRINTS_TTL segundos.
+        """
+        agora = time.monotonic()
+        if self._indice_em and agora - self._indice_em <= INDICE_PRINTS_TTL:
+            return self._indice_imagens
+
+        indice: Optional[Set[str]] = set()
+        try:
+            with os.scandir(self.prints_dir) as it:
+                for entry in it:
+                    nome = os.path.normcase(entry.name) if SISTEMA_ARQUIVOS_CASE_INSENSITIVE else entry.name
+                    numero, ponto, ext = nome.rpartition('.')
+                    # Como no exists(): um link quebrado não conta
+                    if not ponto or ponto + ext not in _EXTENSOES or (entry.is_symlink() and not os.path.exists(entry.path)):
+                        continue
+                    indice.add(numero)
+        except FileNotFoundError:
+            # Sem pasta de prints, a imagem não é verificada
+            indice = None
+        except NotADirectoryError:
+            # Caminho existe mas não é pasta: nenhuma imagem é encontrada
+            pass
+
+        self._indice_imagens = indice
+        self._indice_em = agora
+        return indice
 
-    def verificar_contrato(self, row: pd.Series, numero_contrato: str) -> List[Dict]:
+    def verificar_contrato(self, row: Mapping, numero_contrato: str) -> List[Dict]:
         """
         Verifica um contrato e retorna lista de pendências.
 
         Args:
-            row: Linha da planilha com dados do contrato
+            row: Linha da planilha com dados do contrato (Series ou dict)
             numero_contrato: Número do contrato
 
         Returns:
@@ -51,25 +100,34 @@ class VerificadorPendencias:
         pendencias = []
 
         # Verifica campos obrigatórios
-        for campo, descricao in self.CAMPOS_OBRIGATORIOS.items():
+        for campo, descricao, observacao in self._CAMPOS:
             valor = row.get(campo, '')
-            if pd.isna(valor) or str(valor).strip() == '':
+            # Vazio: None, NaN (linhas lidas pelo pandas) ou só espaços; texto, o caso
+            # comum, é testado direto, sem o str() e a cópia do strip()
+            if isinstance(valor, str):
+                vazio = not valor or valor.isspace()
+            else:
+                vazio = valor is None or (isinstance(valor, float) and valor != valor) or str(valor).strip() == ''
+            if vazio:
                 pendencias.append({
                     'contrato': numero_contrato,
                     'campo': campo,
                     'descricao': descricao,
-                    'observacao': f'{descricao} não preenchido'
+                    'observacao': observacao
                 })
 
         # Verifica se existe imagem da cláusula
-        if self.prints_dir and self.prints_dir.exists():
-            imagem_encontrada = False
-            for ext in ['.png', '.jpg', '.jpeg', '.PNG', '.JPG', '.JPEG']:
-                if (self.prints_dir / f"{numero_contrato}{ext}").exists():
-                    imagem_encontrada = True
-                    break
-
-            if not imagem_encontrada:
+        com_imagem = self._contratos_com_imagem() if self.prints_dir else None
+        if com_imagem is not None:
+            if '/' in numero_contrato or os.sep in numero_contrato:
+                # O número aponta para uma subpasta, que o índice não cobre; caminho
+                # montado uma vez como str, sem um Path novo por extensão
+                base = os.path.join(self._prints_prefixo, numero_contrato)
+                encontrada = any(os.path.exists(base + ext) for ext in EXTENSOES_IMAGEM)
+            else:
+                chave = os.path.normcase(numero_contrato) if SISTEMA_ARQUIVOS_CASE_INSENSITIVE else numero_contrato
+                encontrada = chave in com_imagem
+            if not encontrada:
                 pendencias.append({
                     'contrato': numero_contrato,
                     'campo': 'imagem_clausula',